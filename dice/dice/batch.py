@@ -0,0 +1,240 @@
+from typing import NamedTuple, Union
+
+import numpy as np
+
+from dice.error.custom import *
+from dice.dice.element import *
+from dice.dice.element import Base, MAXAMOUNT, MAXSHAPE
+from dice.dice.cost import ARITHMETIC, Interval, bound
+
+__all__ = ["evaluate_many"]
+
+class Pool(NamedTuple):
+    """
+    N dice pools padded to the widest one.
+    values: (N, M) faces, mask: (N, M) which faces exist
+    """
+    values: np.ndarray
+    mask: np.ndarray
+
+    def total(self) -> np.ndarray:
+        return np.where(self.mask, self.values, 0).sum(axis=1)
+
+class Range(NamedTuple):
+    """N faces (low, high) of a Pair, not to be taken for a Pool"""
+    low: np.ndarray
+    high: np.ndarray
+
+Value = Union[np.ndarray, Pool, Range]
+
+# symmetric, so negating a value never leaves int64 either
+LARGEST = int(np.iinfo(np.int64).max)
+
+COMPARISONS = {
+    GE: np.greater_equal, LE: np.less_equal,
+    GT: np.greater, LT: np.less,
+    EQ: np.equal, NE: np.not_equal,
+}
+
+def evaluate_many(
+    tree: Base,
+    n: int,
+    rng: Union[None, int, np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Roll tree n times at once, no transcript is recorded.
+    Every die of the batch is drawn in one call per Dice node and
+    Repeat bodies are rolled for all iterations of all rolls together.
+    return:
+        np.ndarray: int(tree.evaluate()) of every roll, shape (n,)
+    ex) evaluate_many(parse("4d6k3"), 3, rng=0) -> array([13, 9, 14])
+    """
+    if n < 0:
+        raise ValueError("n must not be negative")
+    check(tree)
+    return total(Batch(np.random.default_rng(rng)).run(tree, n))
+
+def check(node: Base):
+    """
+    Raise OverflowError when any value of node may leave int64,
+    the interpreter goes on with Python ints where a batch would wrap
+    """
+    if isinstance(node, Integer):
+        intervals = [Interval(int(node), int(node))]
+    else:
+        b = bound(node)
+        intervals = [b.total, b.item]
+    if type(node) in ARITHMETIC:
+        # operands are folded left to right, every step must fit
+        first, *rest = [bound(operand).total for operand in node.operands]
+        for value in rest:
+            first = ARITHMETIC[type(node)](first, value)
+            intervals.append(first)
+
+    for interval in intervals:
+        if max(-interval.low, interval.high) > LARGEST:
+            raise OverflowError(f"{node.name} may not fit in int64")
+    for operand in getattr(node, "operands", getattr(node, "values", [])):
+        check(operand)
+
+def total(value: Value) -> np.ndarray:
+    if isinstance(value, Pool):
+        return value.total()
+    if isinstance(value, Range):
+        # int(Pair) fails in the interpreter as well
+        raise TypeError("pair can not be used as a number")
+    return value
+
+def pool(value: Value) -> Pool:
+    if isinstance(value, Pool):
+        return value
+    if isinstance(value, Range):
+        raise TypeError("pair can not be used as a dice pool")
+    return Pool(value[:, None], np.ones((len(value), 1), dtype=bool))
+
+class Batch:
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+
+    def run(self, node: Base, n: int) -> Value:
+        if isinstance(node, Integer):
+            return np.full(n, int(node), dtype=np.int64)
+
+        method = getattr(self, node.name.lower(), None)
+        if method is None:
+            raise TypeError(f"{node.name} can not be evaluated in a batch")
+        return method(node, n)
+
+    def operands(self, node: Base, n: int):
+        return [self.run(operand, n) for operand in node.operands] # type: ignore
+
+    def fold(self, node: Base, n: int, function) -> np.ndarray:
+        value, *rest = [total(x) for x in self.operands(node, n)]
+        for operand in rest:
+            value = function(value, operand)
+        return value
+
+    def add(self, node: Add, n: int) -> np.ndarray:
+        return self.fold(node, n, np.add)
+
+    def sub(self, node: Sub, n: int) -> np.ndarray:
+        return self.fold(node, n, np.subtract)
+
+    def mul(self, node: Mul, n: int) -> np.ndarray:
+        return self.fold(node, n, np.multiply)
+
+    def div(self, node: Div, n: int) -> np.ndarray:
+        value, *rest = [total(x) for x in self.operands(node, n)]
+        for divisor in rest:
+            if not divisor.all():
+                raise ZeroDivisionError()
+            value = np.floor_divide(value, divisor)
+        return value
+
+    def neg(self, node: Neg, n: int) -> Value:
+        (value,) = self.operands(node, n)
+        if isinstance(value, Pool):
+            return Pool(-value.values, value.mask)
+        return -total(value)
+
+    def pair(self, node: Pair, n: int) -> Range:
+        low, high = (total(self.run(value, n)) for value in node.values)
+        if (low > high).any():
+            raise RangeException()
+        return Range(low, high)
+
+    def shape(self, value: Value) -> Range:
+        # a Pool is a tuple too, only a Pair gives its own faces
+        if isinstance(value, Range):
+            return value
+        high = total(value)
+        return Range(np.ones_like(high), high)
+
+    def roll(self, amount: np.ndarray, shape: Range) -> Pool:
+        low, high = shape
+        if (amount >= MAXAMOUNT).any():
+            raise AmountOverException()
+        if (high >= MAXSHAPE).any():
+            raise ShapeOverException()
+
+        width = max(int(amount.max(initial=0)), 0)
+        mask = np.arange(width) < amount[:, None]
+        if (mask.any(axis=1) & (low > high)).any():
+            raise ValueError("empty range for dice")
+
+        # empty rows may carry an invalid range, roll them as 1d1
+        valid = low <= high
+        low = np.where(valid, low, 1)[:, None]
+        high = np.where(valid, high, 1)[:, None]
+        values = self.rng.integers(
+            low, high, size=(len(amount), width), endpoint=True
+        )
+        return Pool(values, mask)
+
+    def dice(self, node: Dice, n: int) -> Pool:
+        value, *rest = self.operands(node, n)
+        for shape in rest:
+            value = self.roll(total(value), self.shape(shape))
+        return value # type: ignore
+
+    def singledice(self, node: SingleDice, n: int) -> Pool:
+        (shape,) = self.operands(node, n)
+        return self.roll(np.ones(n, dtype=np.int64), self.shape(shape))
+
+    def compare(self, node: Base, n: int) -> Pool:
+        function = COMPARISONS[type(node)]
+        value, *rest = self.operands(node, n)
+        result = pool(value)
+        for operand in rest:
+            y = total(operand)[:, None]
+            result = Pool(
+                function(result.values, y).astype(np.int64), result.mask
+            )
+        return result
+
+    ge = le = gt = lt = eq = ne = compare
+
+    def keep(self, node: Base, n: int) -> Pool:
+        value, *rest = self.operands(node, n)
+        result = pool(value)
+        highest = isinstance(node, KeepMax)
+        for operand in rest:
+            result = self.select(result, total(operand), highest)
+        return result
+
+    keepmax = keepmin = keep
+
+    def select(self, value: Pool, amount: np.ndarray, highest: bool) -> Pool:
+        """Keep the amount highest (lowest) faces of every row"""
+        values, mask = value
+        width = values.shape[1]
+        if width == 0:
+            return value
+
+        # negate for highest first, missing faces sort behind all faces
+        sign = -1 if highest else 1
+        keys = np.where(mask, sign * values, np.iinfo(np.int64).max)
+
+        amount = np.clip(amount, 0, width)
+        k = int(amount.max(initial=0))
+        if (amount == k).all() and 0 < k < width:
+            keys = np.partition(keys, k - 1, axis=1)
+        else:
+            keys = np.sort(keys, axis=1)
+
+        count = np.minimum(amount, mask.sum(axis=1))
+        kept = np.arange(k) < count[:, None]
+        return Pool(np.where(kept, sign * keys[:, :k], 0), kept)
+
+    def repeat(self, node: Repeat, n: int) -> Pool:
+        count, body = node.operands
+        amount = total(self.run(count, n))
+        if (amount >= MAXAMOUNT).any():
+            raise AmountOverException()
+
+        width = max(int(amount.max(initial=0)), 0)
+        mask = np.arange(width) < amount[:, None]
+        values = np.zeros((n, width), dtype=np.int64)
+        if mask.any():
+            values[mask] = total(self.run(body, int(mask.sum())))
+        return Pool(values, mask)
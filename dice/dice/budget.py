@@ -0,0 +1,59 @@
+import time
+from typing import Callable, Optional
+
+from dice.error.custom import BudgetOverException
+
+__all__ = ["Budget"]
+
+class Budget:
+    """
+    Limits of one evaluation, checked while it runs.
+
+    Every evaluated node, every Repeat iteration and every roll checks
+    the budget, so a long evaluation stops at the next loop boundary
+    once its time, dice or nodes are spent or cancel() was called
+    (from any thread). It raises BudgetOverException.
+    ex) parse("9999n9999d6").evaluate(Context(budget=Budget(seconds=0.1)))
+        -> BudgetOverException
+    """
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        dice: Optional[int] = None,
+        nodes: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.clock = clock
+        self.deadline = None if seconds is None else clock() + seconds
+        self.dice = dice
+        self.nodes = nodes
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the evaluation at its next check"""
+        self.cancelled = True
+
+    def check(self):
+        """
+        Raise when cancelled or out of time
+        """
+        if self.cancelled:
+            raise BudgetOverException("cancelled")
+        if self.deadline is not None and self.clock() > self.deadline:
+            raise BudgetOverException("out of time")
+
+    def node(self):
+        """One node is about to be evaluated"""
+        if self.nodes is not None:
+            self.nodes -= 1
+            if self.nodes < 0:
+                raise BudgetOverException("out of nodes")
+        self.check()
+
+    def roll(self, amount: int):
+        """amount dice are about to be rolled"""
+        if self.dice is not None and amount > 0:
+            self.dice -= amount
+            if self.dice < 0:
+                raise BudgetOverException("out of dice")
+        self.check()
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List, TextIO, Union
+
+from dice.dice.element import IntegerList
+from dice.dice.profile import profiler
+
+__all__ = ["ChromeTrace"]
+
+# longest node text kept in the arguments of a span
+MAXTEXT = 80
+
+class ChromeTrace:
+    """
+    Begin/end span of every node evaluated in a context,
+    written as Chrome trace-event JSON (Perfetto, about:tracing).
+    ex) trace = ChromeTrace()
+        parse("3n2d6").evaluate(Context(tracer=trace))
+        trace.dump("roll.json")
+    """
+    def __init__(self, clock: Callable[[], float] = perf_counter):
+        self.clock = clock
+        self.origin = clock()
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+
+    def event(self, phase: str, name: str, args: Dict[str, Any]):
+        self.events.append({
+            "name": name,
+            "cat": "dice",
+            "ph": phase,
+            "ts": (self.clock() - self.origin) * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def begin(self, name: str, **args: Any):
+        self.event("B", name, args)
+
+    def end(self, name: str, **args: Any):
+        self.event("E", name, args)
+
+    def enter(self, node: Any):
+        """Open the span of node"""
+        operands = getattr(node, "operands", getattr(node, "values", []))
+        self.begin(
+            node.name,
+            node=text(node),
+            operands=[operand.name for operand in operands],
+        )
+
+    def leave(self, node: Any, result: Any):
+        """Close the span of node evaluated to result"""
+        size = len(result) if isinstance(result, IntegerList) else 1
+        self.end(node.name, size=size, result=text(result))
+
+    def fail(self, node: Any, error: BaseException):
+        """Close the span of node whose evaluation raised error"""
+        self.end(node.name, error=type(error).__name__)
+
+    def span(self, node: Any, context: Any) -> Any:
+        """
+        Evaluate node within a span
+        return:
+            Base
+        """
+        self.enter(node)
+        try:
+            if profiler.enabled:
+                result = profiler.measure(
+                    "evaluate", node.name, node._evaluate, context
+                )
+            else:
+                result = node._evaluate(context)
+        except Exception as e:
+            self.fail(node, e)
+            raise
+
+        self.leave(node, result)
+        return result
+
+    def json(self) -> Dict[str, Any]:
+        """
+        return:
+            Dict: trace-event JSON object
+        """
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def dump(self, file: Union[str, TextIO]):
+        """Write the trace to a path or an open text file"""
+        if isinstance(file, str):
+            with open(file, "w") as f:
+                json.dump(self.json(), f)
+        else:
+            json.dump(self.json(), file)
+
+def text(value: Any) -> str:
+    string = str(value)
+    if len(string) > MAXTEXT:
+        return string[:MAXTEXT - 1] + "…"
+    return string
@@ -0,0 +1,75 @@
+import threading
+from typing import Any, Dict, Optional
+
+from dice.dice.budget import Budget
+from dice.dice.recorder import Recorder, active_recorder, tracing
+from dice.dice.source import Source, as_source
+
+__all__ = ["Context"]
+
+class Context:
+    """
+    Per-evaluation state.
+
+    Intermediate results of every node and the recorder receiving the
+    transcript live here instead of on the tree, so a parsed tree is
+    never written to and may be evaluated by many threads at once.
+    By default the transcript is recorded only when somebody can read
+    it: into recorder when one is given, else into the recorder of the
+    enclosing recording block (see active_recorder). Outside of one
+    nothing is recorded and recorder is None, as with trace=False;
+    trace=True records into a new Recorder even then.
+    Dice are rolled from the context's own random source, see as_source
+    for what rng may be, and a budget stops the evaluation once spent.
+    A tracer (ChromeTrace) gets a span around every evaluated node.
+    iterative evaluates with an explicit stack (see walk) instead of
+    recursion, by default only off the main thread whose stack is small.
+    """
+    def __init__(
+        self,
+        recorder: Optional[Recorder] = None,
+        rng: Optional[Any] = None,
+        trace: Optional[bool] = None,
+        budget: Optional[Budget] = None,
+        tracer: Optional[Any] = None,
+        iterative: Optional[bool] = None
+    ):
+        self.recorder: Optional[Recorder] = None
+        if trace is None:
+            trace = recorder is not None or tracing()
+        if trace:
+            self.recorder = (
+                recorder if recorder is not None else active_recorder()
+            )
+        self.random: Source = as_source(rng)
+        self.budget: Optional[Budget] = budget
+        self.tracer: Optional[Any] = tracer
+        if iterative is None:
+            main = threading.main_thread()
+            iterative = threading.current_thread() is not main
+        self.iterative: bool = iterative
+        self.outcomes: Dict[int, Dict[str, Any]] = {}
+
+    def outcome(self, node: Any) -> Dict[str, Any]:
+        """
+        Outcome of node in this evaluation, created on first use
+        return:
+            Dict[str, Base]
+        ex) Context().outcome(Integer(3)) -> {"result": 3}
+        """
+        outcome = self.outcomes.get(id(node))
+        if outcome is None:
+            outcome = self.outcomes[id(node)] = {"result": node}
+        return outcome
+
+    def result(self, node: Any) -> Any:
+        """
+        Last result of node, or node itself when it was never evaluated
+        return:
+            Base
+        ex) Context().result(Integer(3)) -> 3
+        """
+        outcome = self.outcomes.get(id(node))
+        if outcome is None:
+            return node
+        return outcome["result"]
@@ -0,0 +1,237 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Type
+
+from dice.error.custom import *
+from dice.dice.element import *
+from dice.dice.element import Base, MAXAMOUNT
+
+__all__ = ["Cost", "Limits", "estimate", "admit"]
+
+class Cost(NamedTuple):
+    """
+    Upper bounds of one evaluation.
+    dice: dice rolled, nodes: evaluate calls,
+    transcript: bytes of the detailed transcript
+    """
+    dice: int = 0
+    nodes: int = 0
+    transcript: int = 0
+
+    def plus(self, other: "Cost") -> "Cost":
+        return Cost(*(a + b for a, b in zip(self, other)))
+
+    def times(self, count: int) -> "Cost":
+        return Cost(*(a * count for a in self))
+
+class Limits(NamedTuple):
+    """Largest Cost admitted for evaluation"""
+    dice: int = 1_000_000
+    nodes: int = 1_000_000
+    transcript: int = 10_000_000
+
+class Interval(NamedTuple):
+    low: int
+    high: int
+
+    def width(self) -> int:
+        """bytes of the longest value within the interval"""
+        return max(len(str(self.low)), len(str(self.high)))
+
+class Bound(NamedTuple):
+    """
+    What one evaluation of a node may return and what it costs.
+    total bounds int(value), a pool has at most items values within item.
+    """
+    total: Interval
+    items: int
+    item: Interval
+    cost: Cost
+    pair: bool = False
+
+def estimate(tree: Base) -> Cost:
+    """
+    Upper bounds of evaluating tree, without rolling any dice.
+    Repeat amounts multiply the cost of their body and dynamic amounts
+    are bounded by the largest value they may take.
+    return:
+        Cost
+    ex) estimate(parse("(1d6)d6")) -> Cost(dice=7, nodes=5, transcript=...)
+    """
+    return bound(tree).cost
+
+def admit(tree: Base, limits: Optional[Limits] = None) -> Cost:
+    """
+    Estimate tree and reject it before evaluation when over limits
+    return:
+        Cost
+    ex) admit(parse("9999n9999d6")) -> CostOverException
+    """
+    if limits is None:
+        limits = Limits()
+    cost = estimate(tree)
+    for field, value, limit in zip(Cost._fields, cost, limits):
+        if value > limit:
+            raise CostOverException(f"{field} {value} over {limit}")
+    return cost
+
+def bound(node: Base) -> Bound:
+    if isinstance(node, Integer):
+        value = Interval(int(node), int(node))
+        return Bound(value, 1, value, Cost(nodes=1))
+
+    bounder = BOUNDERS.get(type(node))
+    if bounder is None:
+        raise NotImplementedError(f"{node.name} has no cost estimate")
+    return bounder(node)
+
+def operands(node: Base) -> List[Bound]:
+    return [bound(operand) for operand in node.operands] # type: ignore
+
+def spent(bounds: List[Bound], **own: int) -> Cost:
+    """Cost of evaluating every bound plus the node itself"""
+    cost = Cost(nodes=1, **own)
+    for b in bounds:
+        cost = cost.plus(b.cost)
+    return cost
+
+def scalar(total: Interval, cost: Cost) -> Bound:
+    return Bound(total, 1, total, cost)
+
+def pool(items: int, item: Interval, cost: Cost) -> Bound:
+    total = Interval(min(0, items * item.low), max(0, items * item.high))
+    return Bound(total, items, item, cost)
+
+def listed(b: Bound) -> int:
+    """bytes of a pool formatted as a list"""
+    return 2 + b.items * (b.item.width() + 2)
+
+def shown(b: Bound) -> int:
+    """bytes of an operand formatted as it is, number, list or pair"""
+    return max(listed(b), b.total.width())
+
+def corners(
+    a: Interval,
+    b: Interval,
+    function: Callable[[int, int], int]
+) -> Interval:
+    values = [function(x, y) for x in a for y in b]
+    return Interval(min(values), max(values))
+
+def bound_neg(node: Neg) -> Bound:
+    (value,) = operands(node)
+    cost = spent([value])
+    item = Interval(-value.item.high, -value.item.low)
+    total = Interval(-value.total.high, -value.total.low)
+    return Bound(total, value.items, item, cost)
+
+def bound_arithmetic(node: Base) -> Bound:
+    first, *rest = values = operands(node)
+    total = first.total
+    for value in rest:
+        total = ARITHMETIC[type(node)](total, value.total)
+    return scalar(total, spent(values))
+
+def add(a: Interval, b: Interval) -> Interval:
+    return Interval(a.low + b.low, a.high + b.high)
+
+def sub(a: Interval, b: Interval) -> Interval:
+    return Interval(a.low - b.high, a.high - b.low)
+
+def mul(a: Interval, b: Interval) -> Interval:
+    return corners(a, b, lambda x, y: x * y)
+
+def div(a: Interval, b: Interval) -> Interval:
+    if b.low <= 0 <= b.high:
+        # any integer divisor but 0 keeps |x // y| <= |x|
+        largest = max(abs(a.low), abs(a.high))
+        return Interval(-largest, largest)
+    return corners(a, b, lambda x, y: x // y)
+
+ARITHMETIC = {Add: add, Sub: sub, Mul: mul, Div: div}
+
+def bound_pair(node: Pair) -> Bound:
+    values = [bound(value) for value in node.values]
+    item = Interval(
+        min(v.total.low for v in values), max(v.total.high for v in values)
+    )
+    # int() of a pair fails, iterating it gives its values
+    return Bound(item, len(values), item, spent(values), pair=True)
+
+def faces(shape: Bound) -> Interval:
+    if shape.pair:
+        return shape.item
+    high = shape.total.high
+    return Interval(min(1, high), max(1, high))
+
+def rolled(amount: Bound, shape: Bound, cost: Cost) -> Bound:
+    items = max(amount.total.high, 0)
+    face = faces(shape)
+    result = pool(items, face, Cost())
+    text = (
+        16 + amount.total.width() + shown(shape)
+        + listed(result) + result.total.width()
+    )
+    return result._replace(cost=cost.plus(Cost(dice=items, transcript=text)))
+
+def bound_dice(node: Dice) -> Bound:
+    value, *rest = values = operands(node)
+    cost = spent(values)
+    for shape in rest:
+        value = rolled(value, shape, Cost())
+        cost = cost.plus(value.cost)
+    return value._replace(cost=cost)
+
+def bound_single_dice(node: SingleDice) -> Bound:
+    (shape,) = values = operands(node)
+    one = scalar(Interval(1, 1), Cost())
+    value = rolled(one, shape, Cost())
+    return value._replace(cost=spent(values).plus(value.cost))
+
+def bound_comparison(node: Base) -> Bound:
+    first, *rest = values = operands(node)
+    value, text = first, 0
+    for other in rest:
+        value = pool(value.items, Interval(0, 1), Cost())
+        text += 8 + shown(first) + shown(other) + listed(value) \
+            + value.total.width()
+        first = value
+    return value._replace(cost=spent(values, transcript=text))
+
+def bound_keep(node: Base) -> Bound:
+    first, *rest = values = operands(node)
+    value, text = first, 0
+    for amount in rest:
+        items = min(value.items, max(amount.total.high, 0))
+        kept = pool(items, value.item, Cost())
+        # struck dice take four more bytes each
+        text += 8 + listed(value) + 4 * value.items \
+            + shown(amount) + listed(kept)
+        value = kept
+    return value._replace(cost=spent(values, transcript=text))
+
+def bound_repeat(node: Repeat) -> Bound:
+    amount, body = values = operands(node)
+    # larger amounts raise before the first iteration
+    count = min(max(amount.total.high, 0), MAXAMOUNT - 1)
+
+    result = pool(count, body.total, Cost())
+    text = 24 + listed(result) + result.total.width()
+    # "#1-2" and " " around every iteration
+    text += count * (8 + 2 * len(str(count)))
+    cost = amount.cost.plus(body.cost.times(count))
+    cost = cost.plus(Cost(nodes=1, transcript=text))
+    return result._replace(cost=cost)
+
+BOUNDERS: Dict[Type[Base], Callable[..., Bound]] = {
+    Neg: bound_neg,
+    Add: bound_arithmetic,
+    Sub: bound_arithmetic,
+    Mul: bound_arithmetic,
+    Div: bound_arithmetic,
+    Pair: bound_pair,
+    Dice: bound_dice,
+    SingleDice: bound_single_dice,
+    Repeat: bound_repeat,
+    KeepMax: bound_keep,
+    KeepMin: bound_keep,
+    **{cls: bound_comparison for cls in (GE, LE, GT, LT, EQ, NE)},
+}
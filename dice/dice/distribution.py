@@ -0,0 +1,508 @@
+import math
+import operator
+from bisect import bisect_left
+from fractions import Fraction
+from functools import lru_cache
+from itertools import accumulate
+from typing import (
+    Callable, Dict, Iterable, List, Mapping, Tuple, Union,
+)
+
+from dice.error.custom import *
+from dice.dice.element import *
+from dice.dice.element import Base, MAXAMOUNT, MAXSHAPE
+
+__all__ = ["Distribution", "distribution", "keep_distribution"]
+
+Number = Union[int, Fraction]
+
+class Distribution:
+    """
+    Exact probability mass function over the integers.
+    Instances are immutable and hashable so they can be memoized.
+    """
+    def __init__(self, pmf: Mapping[int, Number]):
+        items = sorted(
+            (int(value), Fraction(p)) for value, p in pmf.items() if p
+        )
+        self.pmf: Dict[int, Fraction] = dict(items)
+        self.values: Tuple[int, ...] = tuple(v for v, _ in items)
+        self.cumulative: Tuple[Fraction, ...] = tuple(
+            accumulate(p for _, p in items)
+        )
+        self.key = tuple(items)
+        self.hash = hash(self.key)
+
+    @classmethod
+    def constant(cls, value: int) -> "Distribution":
+        return cls({value: 1})
+
+    @classmethod
+    def uniform(cls, low: int, high: int) -> "Distribution":
+        """
+        return:
+            Distribution: one die with faces low..high
+        ex) Distribution.uniform(1, 6)[3] -> 1/6
+        """
+        if low > high:
+            raise ValueError("empty range for dice")
+        return cls.dice(1, low, high)
+
+    @classmethod
+    def dice(cls, amount: int, low: int, high: int) -> "Distribution":
+        """
+        return:
+            Distribution: sum of amount dice with faces low..high
+        ex) Distribution.dice(2, 1, 6)[7] -> 1/6
+        """
+        return dice_distribution(amount, low, high)
+
+    def __repr__(self) -> str:
+        items = ", ".join(f"{v}: {p}" for v, p in self.pmf.items())
+        return f"Distribution({{{items}}})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Distribution):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __getitem__(self, value: int) -> Fraction:
+        return self.pmf.get(value, Fraction(0))
+
+    def __iter__(self):
+        return iter(self.pmf.items())
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def min(self) -> int:
+        return self.values[0]
+
+    @property
+    def max(self) -> int:
+        return self.values[-1]
+
+    @property
+    def mean(self) -> Fraction:
+        return sum((v * p for v, p in self), Fraction(0))
+
+    @property
+    def variance(self) -> Fraction:
+        mean = self.mean
+        return sum(((v - mean) ** 2 * p for v, p in self), Fraction(0))
+
+    def cdf(self, value: int) -> Fraction:
+        """
+        return:
+            Fraction: P(X <= value)
+        ex) Distribution.uniform(1, 6).cdf(2) -> 1/3
+        """
+        index = bisect_left(self.values, value + 1)
+        return self.cumulative[index - 1] if index else Fraction(0)
+
+    def quantile(self, q: Number) -> int:
+        """
+        return:
+            int: smallest value whose cdf reaches q
+        ex) Distribution.dice(3, 1, 6).quantile(Fraction(1, 2)) -> 10
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("quantile must be within [0, 1]")
+        index = bisect_left(self.cumulative, q)
+        return self.values[min(index, len(self.values) - 1)]
+
+    def probability(self, predicate: Callable[[int], bool]) -> Fraction:
+        return sum((p for v, p in self if predicate(v)), Fraction(0))
+
+    def map(self, function: Callable[[int], int]) -> "Distribution":
+        pmf: Dict[int, Fraction] = {}
+        for v, p in self:
+            w = function(v)
+            pmf[w] = pmf.get(w, 0) + p
+        return Distribution(pmf)
+
+    def combine(
+        self,
+        other: "Distribution",
+        function: Callable[[int, int], int]
+    ) -> "Distribution":
+        """Distribution of function(X, Y) for independent X and Y"""
+        pmf: Dict[int, Fraction] = {}
+        for x, p in self:
+            for y, q in other:
+                z = function(x, y)
+                pmf[z] = pmf.get(z, 0) + p * q
+        return Distribution(pmf)
+
+    def __add__(self, other: "Distribution") -> "Distribution":
+        return convolve(self, other)
+
+    def __neg__(self) -> "Distribution":
+        return self.map(operator.neg)
+
+    def __sub__(self, other: "Distribution") -> "Distribution":
+        return convolve(self, -other)
+
+    def __mul__(self, other: "Distribution") -> "Distribution":
+        return self.combine(other, operator.mul)
+
+    def __floordiv__(self, other: "Distribution") -> "Distribution":
+        if other[0]:
+            raise ZeroDivisionError()
+        return self.combine(other, operator.floordiv)
+
+    def power(self, amount: int) -> "Distribution":
+        """
+        return:
+            Distribution: sum of amount independent copies
+        ex) Distribution.uniform(1, 6).power(2) == Distribution.dice(2, 1, 6)
+        """
+        return power(self, max(amount, 0))
+
+def integers(x: Distribution) -> Tuple[int, List[Tuple[int, int]]]:
+    """Probabilities of x as integer weights over a common denominator"""
+    denominator = math.lcm(*(p.denominator for _, p in x))
+    return denominator, [
+        (v, p.numerator * (denominator // p.denominator)) for v, p in x
+    ]
+
+@lru_cache(maxsize=1024)
+def convolve(x: Distribution, y: Distribution) -> Distribution:
+    dx, wx = integers(x)
+    dy, wy = integers(y)
+    counts: Dict[int, int] = {}
+    for a, p in wx:
+        for b, q in wy:
+            counts[a + b] = counts.get(a + b, 0) + p * q
+    scale = dx * dy
+    return Distribution({v: Fraction(w, scale) for v, w in counts.items()})
+
+@lru_cache(maxsize=1024)
+def power(x: Distribution, amount: int) -> Distribution:
+    if amount == 0:
+        return Distribution.constant(0)
+    if amount == 1:
+        return x
+    half = power(x, amount // 2)
+    result = convolve(half, half)
+    return convolve(result, x) if amount % 2 else result
+
+@lru_cache(maxsize=1024)
+def dice_distribution(amount: int, low: int, high: int) -> Distribution:
+    """NdS by sliding window over integer counts, memoized per (N, S)"""
+    if amount <= 0:
+        return Distribution.constant(0)
+    if low > high:
+        raise ValueError("empty range for dice")
+
+    sides = high - low + 1
+    counts = [1]
+    for _ in range(amount):
+        window, new = 0, []
+        for i in range(len(counts) + sides - 1):
+            if i < len(counts):
+                window += counts[i]
+            if i >= sides:
+                window -= counts[i - sides]
+            new.append(window)
+        counts = new
+
+    total = sides ** amount
+    return Distribution({
+        amount * low + i: Fraction(c, total) for i, c in enumerate(counts)
+    })
+
+@lru_cache(maxsize=1024)
+def keep_distribution(
+    amount: int,
+    face: Distribution,
+    keep: int,
+    highest: bool = True
+) -> Distribution:
+    """
+    Sum of the keep highest (lowest) of amount independent faces.
+
+    Order statistic DP: faces are visited from best to worst, choosing
+    how many dice show each face, with state (dice placed, kept sum).
+    Once keep dice are placed the rest only has to show worse faces, so
+    the cost is polynomial in amount, faces and keep instead of
+    faces ** amount. Weights are integers over a common denominator.
+    return:
+        Distribution
+    ex) keep_distribution(2, Distribution.uniform(1, 20), 1).mean -> 553/40
+    """
+    keep = min(keep, amount)
+    if keep <= 0:
+        return Distribution.constant(0)
+    if keep == amount:
+        return compound(Distribution.constant(amount), face)
+
+    denominator, weights = integers(face)
+    if highest:
+        weights.reverse()
+    worse = list(accumulate(
+        (a for _, a in reversed(weights[1:])), initial=0
+    ))[::-1]
+
+    final: Dict[int, int] = {}
+    states: Dict[Tuple[int, int], int] = {(0, 0): 1}
+    for (v, a), rest in zip(weights, worse):
+        new: Dict[Tuple[int, int], int] = {}
+        for (placed, kept), w in states.items():
+            left = amount - placed
+            for count in range(left + 1):
+                weight = w * math.comb(left, count) * a ** count
+                total = kept + v * min(count, keep - placed)
+                if placed + count >= keep:
+                    weight *= rest ** (left - count)
+                    final[total] = final.get(total, 0) + weight
+                else:
+                    key = (placed + count, total)
+                    new[key] = new.get(key, 0) + weight
+        states = new
+
+    scale = denominator ** amount
+    return Distribution({v: Fraction(w, scale) for v, w in final.items()})
+
+def mix(parts: Iterable[Tuple[Fraction, Distribution]]) -> Distribution:
+    pmf: Dict[int, Fraction] = {}
+    for weight, part in parts:
+        for v, p in part:
+            pmf[v] = pmf.get(v, 0) + weight * p
+    return Distribution(pmf)
+
+Component = Tuple[Fraction, Distribution, Distribution]
+
+class PoolDistribution:
+    """
+    Mixture of pools of independent, identically distributed dice.
+    Each component is (weight, amount, face): dice sharing one random
+    shape are only independent once the shape is fixed.
+    """
+    def __init__(self, components: Iterable[Component]):
+        merged: Dict[Tuple[Distribution, Distribution], Fraction] = {}
+        for weight, amount, face in components:
+            if weight:
+                key = (amount, face)
+                merged[key] = merged.get(key, 0) + weight
+        self.components: List[Component] = [
+            (weight, amount, face)
+            for (amount, face), weight in merged.items()
+        ]
+
+    def total(self) -> Distribution:
+        return mix(
+            (weight, compound(amount, face))
+            for weight, amount, face in self.components
+        )
+
+    def map_faces(
+        self,
+        function: Callable[[Distribution], Distribution]
+    ) -> "PoolDistribution":
+        return PoolDistribution(
+            (weight, amount, function(face))
+            for weight, amount, face in self.components
+        )
+
+def compound(amount: Distribution, face: Distribution) -> Distribution:
+    """Sum of amount (itself random) independent faces"""
+    uniform = uniform_range(face)
+    return mix(
+        (p, dice_distribution(n, *uniform) if uniform else face.power(n))
+        for n, p in amount
+    )
+
+def uniform_range(face: Distribution):
+    values = face.values
+    if len(values) == values[-1] - values[0] + 1:
+        if len(set(face.pmf.values())) == 1:
+            return values[0], values[-1]
+    return None
+
+class KeptDistribution:
+    """
+    Total of a kept pool. Kept dice are no longer independent,
+    so only their sum can be used.
+    """
+    def __init__(self, total: Distribution):
+        self.distribution = total
+
+Value = Union[
+    Distribution,
+    PoolDistribution,
+    KeptDistribution,
+    Tuple[Distribution, Distribution],
+]
+
+def distribution(tree: Base) -> Distribution:
+    """
+    Exact distribution of int(tree.evaluate()).
+    Raises the error evaluation could raise with positive probability.
+    return:
+        Distribution
+    ex) distribution(parse("1d6 >= 4")) -> Distribution({0: 1/2, 1: 1/2})
+    """
+    return total(analyse(tree))
+
+def total(value: Value) -> Distribution:
+    if isinstance(value, PoolDistribution):
+        return value.total()
+    if isinstance(value, KeptDistribution):
+        return value.distribution
+    if isinstance(value, tuple):
+        raise TypeError("pair can not be used as a number")
+    return value
+
+def pool(value: Value) -> PoolDistribution:
+    if isinstance(value, PoolDistribution):
+        return value
+    if isinstance(value, KeptDistribution):
+        raise NotImplementedError(
+            "kept dice have no exact per die distribution"
+        )
+    if isinstance(value, tuple):
+        raise TypeError("pair can not be used as a dice pool")
+    return PoolDistribution([(Fraction(1), Distribution.constant(1), value)])
+
+def analyse(node: Base) -> Value:
+    if isinstance(node, Integer):
+        return Distribution.constant(int(node))
+
+    analyser = ANALYSERS.get(type(node))
+    if analyser is None:
+        raise NotImplementedError(
+            f"{node.name} has no exact distribution"
+        )
+    return analyser(node)
+
+def operands(node: Base) -> List[Value]:
+    return [analyse(operand) for operand in node.operands] # type: ignore
+
+def fold(
+    node: Base,
+    function: Callable[[Distribution, Distribution], Distribution]
+) -> Distribution:
+    first, *rest = [total(x) for x in operands(node)]
+    for other in rest:
+        first = function(first, other)
+    return first
+
+def analyse_neg(node: Neg) -> Value:
+    (value,) = operands(node)
+    if isinstance(value, PoolDistribution):
+        return value.map_faces(operator.neg)
+    if isinstance(value, KeptDistribution):
+        return KeptDistribution(-value.distribution)
+    return -total(value)
+
+def analyse_pair(node: Pair) -> Tuple[Distribution, Distribution]:
+    low, high = (total(analyse(value)) for value in node.values)
+    if low.max > high.min:
+        raise RangeException()
+    return low, high
+
+def shapes(value: Value) -> List[Tuple[Fraction, int, int]]:
+    """(probability, min, max) of every possible die shape"""
+    if isinstance(value, tuple):
+        low, high = value
+        return [
+            (p * q, a, b) for a, p in low for b, q in high
+        ]
+    return [(p, 1, s) for s, p in total(value)]
+
+def roll(amount: Distribution, shape: Value) -> PoolDistribution:
+    if amount.max >= MAXAMOUNT:
+        raise AmountOverException()
+
+    components = []
+    for weight, low, high in shapes(shape):
+        if high >= MAXSHAPE:
+            raise ShapeOverException()
+        if low > high:
+            if amount.max > 0:
+                raise ValueError("empty range for dice")
+            low = high
+        components.append((weight, amount, Distribution.uniform(low, high)))
+    return PoolDistribution(components)
+
+def analyse_dice(node: Dice) -> PoolDistribution:
+    value, *rest = operands(node)
+    for shape in rest:
+        value = roll(total(value), shape)
+    return value # type: ignore
+
+def analyse_single_dice(node: SingleDice) -> PoolDistribution:
+    (shape,) = operands(node)
+    return roll(Distribution.constant(1), shape)
+
+COMPARISONS = {
+    GE: operator.ge, LE: operator.le,
+    GT: operator.gt, LT: operator.lt,
+    EQ: operator.eq, NE: operator.ne,
+}
+
+def analyse_comparison(node: Base) -> PoolDistribution:
+    compare = COMPARISONS[type(node)]
+    value, *rest = operands(node)
+    result = pool(value)
+    for operand in rest:
+        components = []
+        for y, q in total(operand):
+            for weight, amount, face in result.components:
+                hit = face.probability(lambda x: compare(x, y))
+                bernoulli = Distribution({0: 1 - hit, 1: hit})
+                components.append((weight * q, amount, bernoulli))
+        result = PoolDistribution(components)
+    return result
+
+def analyse_repeat(node: Repeat) -> PoolDistribution:
+    count, body = node.operands
+    amount = total(analyse(count))
+    if amount.max >= MAXAMOUNT:
+        raise AmountOverException()
+    return PoolDistribution([(Fraction(1), amount, total(analyse(body)))])
+
+def analyse_keep(node: Base) -> KeptDistribution:
+    value, *rest = operands(node)
+    if isinstance(value, KeptDistribution):
+        # the interpreter keeps from kept dice, only this analysis can not
+        raise NotImplementedError(
+            "kept dice have no exact per die distribution"
+        )
+    if not isinstance(value, PoolDistribution):
+        # the interpreter can not iterate a number either
+        raise TypeError(f"{node.name} needs a dice pool")
+
+    # keeping a of the kept b is keeping min(a, b)
+    counts = [total(x) for x in rest]
+    keep = counts[0]
+    for other in counts[1:]:
+        keep = keep.combine(other, min)
+
+    highest = isinstance(node, KeepMax)
+    return KeptDistribution(mix(
+        (weight * p * q, keep_distribution(n, face, m, highest))
+        for weight, amount, face in value.components
+        for n, p in amount
+        for m, q in keep
+    ))
+
+ANALYSERS: Dict[type, Callable[..., Value]] = {
+    Add: lambda node: fold(node, convolve),
+    Sub: lambda node: fold(node, operator.sub),
+    Mul: lambda node: fold(node, operator.mul),
+    Div: lambda node: fold(node, operator.floordiv),
+    Neg: analyse_neg,
+    Pair: analyse_pair,
+    Dice: analyse_dice,
+    SingleDice: analyse_single_dice,
+    Repeat: analyse_repeat,
+    KeepMax: analyse_keep,
+    KeepMin: analyse_keep,
+    **{cls: analyse_comparison for cls in COMPARISONS},
+}
@@ -0,0 +1,48 @@
+from dice.dice.context import Context
+from dice.dice.element import *
+from dice.dice.element import Base, Operator
+
+__all__ = ["fold_constants"]
+
+# Deterministic operators that never write to the recorder
+FOLDABLE = (Add, Sub, Mul, Div, Neg)
+
+def fold_constants(tree: Base) -> Base:
+    """
+    Replace dice free arithmetic subtrees by their Integer value.
+
+    The tree is not modified, folded parents are new nodes. Subtrees that
+    raise (1/0, arithmetic on a pair) are kept so the error still happens
+    during evaluation, and recorded nodes such as comparisons are kept so
+    the transcript stays the same; only their operands are folded.
+    return:
+        Base
+    ex) fold_constants(parse("(2*3)d6")) -> Dice(6, 6)
+    """
+    if isinstance(tree, Pair):
+        values = [fold_constants(value) for value in tree.values]
+        if all(a is b for a, b in zip(values, tree.values)):
+            return tree
+        return Pair(*values)
+
+    if not isinstance(tree, (Operator, Repeat)):
+        return tree
+
+    operands = [fold_constants(operand) for operand in tree.operands]
+    node = tree
+    if any(a is not b for a, b in zip(operands, tree.operands)):
+        node = type(tree)(*operands)
+
+    if not isinstance(node, FOLDABLE):
+        return node
+    if not all(isinstance(operand, Integer) for operand in operands):
+        return node
+
+    try:
+        value = node.evaluate(Context(trace=False))
+    except (ArithmeticError, TypeError):
+        return node
+
+    if not isinstance(value, Integer):
+        return node
+    return value
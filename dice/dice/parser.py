@@ -1,23 +1,28 @@
-from typing import List
-from pyparsing import (
-    Forward,
-    ParserElement,
-    StringStart,
-    StringEnd,
-    Suppress,
-    Word, nums
-)
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, List, NamedTuple, Optional
 
 from dice.dice.association import Association
 from dice.dice.element import *
+from dice.dice.element import Base
+from dice.dice.optimize import fold_constants
+from dice.dice.profile import profiler
 
-__all__ = ["expression"]
+# pyparsing is imported when the grammar is built, on the first parse
+if TYPE_CHECKING:
+    from pyparsing import ParserElement, Word
+
+__all__ = [
+    "expression", "parse", "backends", "Grammar", "Packrat", "MemoInfo",
+    "packrat",
+]
 
 def build_expression(
-    base: Word,
+    base: "Word",
     pair: Association,
     associations: List[Association]
-) -> ParserElement:
+) -> "ParserElement":
+    from pyparsing import Forward, Suppress
+
     expression = Forward()
     last = (
         base | 
@@ -31,21 +36,211 @@ def build_expression(
     expression <<= last
     return expression
 
-integer: Word = Word(nums)
-integer.set_parse_action(Integer.parse)
-
-expression: ParserElement = (
-    StringStart() 
-    + build_expression(
-        integer, Pair, # type: ignore
-        # The order of this list determines operator precedence.
-        [              # type: ignore 
-            Dice, SingleDice, Repeat, KeepMax, KeepMin, 
-            Neg, Div, Mul, Sub, Add, 
-            GE, GT, LE, LT, EQ, NE, 
-        ]
+# The order of this list determines operator precedence.
+precedence: List[Association] = [ # type: ignore
+    Dice, SingleDice, Repeat, KeepMax, KeepMin, 
+    Neg, Div, Mul, Sub, Add, 
+    GE, GT, LE, LT, EQ, NE, 
+]
+
+def build_grammar() -> "ParserElement":
+    from pyparsing import StringEnd, StringStart, Word, nums
+
+    integer = Word(nums)
+    integer.set_parse_action(Integer.parse)
+
+    grammar = (
+        StringStart()
+        + build_expression(
+            integer, Pair, # type: ignore
+            precedence
+        )
+        + StringEnd()
     )
-    + StringEnd()
-)
-expression.enable_packrat()
+    packrat.apply()
+    return grammar
+
+def build_pratt() -> Any:
+    from dice.dice.pratt import PrattParser
+    return PrattParser(Pair, precedence) # type: ignore
+
+class Lazy:
+    """
+    Object built on first use, attributes are looked up on it.
+    Importing the parser builds no grammar and imports no pyparsing,
+    short lived processes only pay for the backend they parse with.
+    ex) expression.parse_string("3d6")  # builds the grammar once
+    """
+    def __init__(self, build: Callable[[], Any]):
+        self.build = build
+        self.built: Optional[Any] = None
+        self.lock = Lock()
+
+    def get(self) -> Any:
+        built = self.built
+        if built is None:
+            with self.lock:
+                if self.built is None:
+                    self.built = self.build()
+                built = self.built
+        return built
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get(), name)
+
+    def __repr__(self) -> str:
+        state = "built" if self.built is not None else "unbuilt"
+        return f"<{self.build.__name__} {state}>"
+
+class Grammar(Lazy):
+    """
+    Lazy pyparsing grammar whose parse_string goes through packrat,
+    so callers of expression hold its lock, get an empty memo and are
+    counted and profiled like parse(string).
+    ex) expression.parse_string("3d6", parse_all=True)[0] -> Dice(3, 6)
+    """
+    def parse_string(
+        self,
+        string: str,
+        parse_all: bool = False,
+        *,
+        parseAll: bool = False
+    ) -> Any:
+        """
+        return:
+            ParseResults
+        """
+        parse_all = parse_all or parseAll
+        if profiler.enabled:
+            return profiler.measure(
+                "parse", "pyparsing", packrat.results, string, parse_all
+            )
+        return packrat.results(string, parse_all)
+
+    parseString = parse_string
+
+class MemoInfo(NamedTuple):
+    parses: int
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    last: int
+    peak: int
+
+class Packrat:
+    """
+    Packrat memo policy of the pyparsing backend.
+
+    pyparsing keeps one memo for the whole process. Parses through the
+    grammar hold lock, start from an empty memo (parse_string resets it)
+    and clear it once done, so no memo outlives its parse and concurrent
+    parses never share one. maxsize bounds the entries of one parse
+    (FIFO), None leaves it unbounded; the grammar backtracks through
+    every precedence level, without a memo parsing is exponential.
+    Counters come from ParserElement.packrat_cache_stats, last and peak
+    are the entries held by the last and the largest parse.
+    ex) packrat.resize(512); packrat.info() -> MemoInfo(parses=3, ...)
+    """
+    def __init__(self, maxsize: Optional[int] = 128):
+        self.check(maxsize)
+        self.maxsize = maxsize
+        self.lock = Lock()
+        self.reset()
+
+    @staticmethod
+    def check(maxsize: Optional[int]):
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize must be positive or None")
+
+    def apply(self):
+        """Set the memo of pyparsing to maxsize"""
+        from pyparsing import ParserElement
+        ParserElement.enable_packrat(self.maxsize, force=True)
+
+    def resize(self, maxsize: Optional[int]):
+        self.check(maxsize)
+        with self.lock:
+            self.maxsize = maxsize
+            if expression.built is not None:
+                self.apply()
+
+    def reset(self):
+        """Zero the counters"""
+        self.parses = 0
+        self.hits = 0
+        self.misses = 0
+        self.last = 0
+        self.peak = 0
+
+    def parse(self, string: str) -> Base:
+        """
+        return:
+            Base: tree of string parsed by the grammar
+        """
+        return self.results(string, True)[0]
+
+    def results(self, string: str, parse_all: bool = False) -> Any:
+        """
+        return:
+            ParseResults: of string parsed by the grammar
+        """
+        from pyparsing import ParserElement
+
+        grammar = expression.get()
+        with self.lock:
+            try:
+                return grammar.parse_string(string, parse_all=parse_all)
+            finally:
+                hits, misses = ParserElement.packrat_cache_stats[:2]
+                ParserElement.reset_cache()
+                # every miss stores one entry, FIFO drops the oldest
+                held = misses if self.maxsize is None \
+                    else min(misses, self.maxsize)
+                self.parses += 1
+                self.hits += hits
+                self.misses += misses
+                self.last = held
+                self.peak = max(self.peak, held)
+
+    def info(self) -> MemoInfo:
+        with self.lock:
+            return MemoInfo(
+                self.parses, self.hits, self.misses,
+                self.maxsize, self.last, self.peak
+            )
+
+packrat = Packrat()
+
+expression: Any = Grammar(build_grammar)
+pratt: Any = Lazy(build_pratt)
+
+backends = {
+    "pyparsing": packrat.parse,
+    "pratt": lambda string: pratt.get().parse(string),
+}
+
+def parse(
+    string: str,
+    backend: str = "pyparsing",
+    optimize: bool = False
+) -> Base:
+    """
+    Parse string with the selected backend,
+    optionally folding dice free subtrees into constants
+    return:
+        Base
+    ex) parse("3d6", backend="pratt") -> Dice(3, 6)
+    ex) parse("(2*3)d6", optimize=True) -> Dice(6, 6)
+    """
+    try:
+        function = backends[backend]
+    except KeyError:
+        raise ValueError(f"unknown parser backend {backend!r}") from None
 
+    if profiler.enabled:
+        tree = profiler.measure("parse", backend, function, string)
+    else:
+        tree = function(string)
+    if optimize:
+        tree = fold_constants(tree)
+    return tree
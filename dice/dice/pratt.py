@@ -0,0 +1,164 @@
+import re
+from typing import Dict, List, Tuple, Type
+
+from pyparsing import ParseException
+
+from dice.dice.association import (
+    RightUnaryAssociation,
+    LeftBinaryAssociation,
+)
+from dice.dice.element import Base, Integer, Pair
+
+__all__ = ["PrattParser"]
+
+Token = Tuple[str, int]
+Operator = Tuple[int, Type[Base]]
+
+# pyparsing's default whitespace
+WHITESPACE = " \t\n\r"
+
+class PrattParser:
+    """
+    Single pass tokenizer and precedence climbing parser.
+
+    It accepts exactly the language of build_expression and builds the
+    same trees: every association in the precedence list is one level,
+    binary levels collect all of their operands into one n-ary node and
+    a failed operand backtracks to before its symbol, like the PEG.
+    """
+    def __init__(
+        self,
+        pair: Type[Pair],
+        associations: List[Type[Base]]
+    ):
+        self.pair = pair
+        self.top: int = len(associations) - 1
+        self.prefix: Dict[str, Operator] = {}
+        self.infix: Dict[str, Operator] = {}
+
+        for level, association in enumerate(associations):
+            if issubclass(association, RightUnaryAssociation):
+                table = self.prefix
+            elif issubclass(association, LeftBinaryAssociation):
+                table = self.infix
+            else:
+                raise TypeError(f"{association.__name__} is not an operator")
+
+            for symbol in association.symbols: # type: ignore
+                table[symbol] = (level, association)
+
+        left, right = pair.symbols
+        self.left, self.right, self.comma = left, right, ","
+
+        symbols = {*self.prefix, *self.infix, left, right, ","}
+        self.pattern = re.compile(
+            r"[ \t\n\r]*(?:(?P<integer>[0-9]+)|(?P<symbol>"
+            + "|".join(
+                re.escape(s) for s in sorted(symbols, key=len, reverse=True)
+            )
+            + r"))"
+        )
+
+    def tokenize(self, string: str) -> List[Token]:
+        """
+        return:
+            List[Token]: (text, location) pairs closed by ("", len)
+        ex) tokenize("3d6") -> [("3", 0), ("d", 1), ("6", 2), ("", 3)]
+        """
+        tokens: List[Token] = []
+        loc, end = 0, len(string.rstrip(WHITESPACE))
+        while loc < end:
+            match = self.pattern.match(string, loc)
+            if match is None:
+                start = len(string) - len(string[loc:].lstrip(WHITESPACE))
+                raise ParseException(string, start, "unexpected character")
+            group = match.lastgroup
+            tokens.append((match.group(group), match.start(group)))
+            loc = match.end()
+
+        tokens.append(("", len(string)))
+        return tokens
+
+    def parse(self, string: str) -> Base:
+        """
+        Parse a whole string
+        return:
+            Base
+        ex) PrattParser(...).parse("4+2*3") -> Add(4, Mul(2, 3))
+        """
+        state = _State(self, string)
+        tree = state.level(self.top)
+        state.expect("")
+        return tree
+
+class _State:
+    def __init__(self, parser: PrattParser, string: str):
+        self.parser = parser
+        self.string = string
+        self.tokens = parser.tokenize(string)
+        self.pos = 0
+
+    def fail(self, message: str):
+        raise ParseException(self.string, self.tokens[self.pos][1], message)
+
+    def expect(self, text: str):
+        if self.tokens[self.pos][0] != text:
+            self.fail(f"expected {text!r}" if text else "expected end of text")
+        self.pos += 1
+
+    def level(self, level: int) -> Base:
+        tokens, infix = self.tokens, self.parser.infix
+
+        prefix = self.parser.prefix.get(tokens[self.pos][0])
+        if prefix is not None and prefix[0] <= level:
+            current, cls = prefix
+            self.pos += 1
+            node = cls(self.level(current))
+        else:
+            current = -1
+            node = self.base()
+
+        while True:
+            operator = infix.get(tokens[self.pos][0])
+            if operator is None:
+                return node
+
+            binding, cls = operator
+            if not current < binding <= level:
+                return node
+
+            operands = [node]
+            while infix.get(tokens[self.pos][0], (None,))[0] == binding:
+                mark = self.pos
+                self.pos += 1
+                try:
+                    operands.append(self.level(binding - 1))
+                except ParseException:
+                    self.pos = mark
+                    break
+
+            if len(operands) > 1:
+                node = cls(*operands)
+            current = binding
+
+    def base(self) -> Base:
+        parser = self.parser
+        text = self.tokens[self.pos][0]
+
+        if text.isdigit():
+            self.pos += 1
+            return Integer(text)
+
+        if text != parser.left:
+            self.fail("expected integer or bracket")
+
+        self.pos += 1
+        first = self.level(parser.top)
+        if self.tokens[self.pos][0] == parser.comma:
+            self.pos += 1
+            second = self.level(parser.top)
+            self.expect(parser.right)
+            return parser.pair(first, second)
+
+        self.expect(parser.right)
+        return first
@@ -0,0 +1,107 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from dice.dice.association import PairAssociation, RightUnaryAssociation
+from dice.dice.element import *
+from dice.dice.element import Base
+
+__all__ = ["VERSION", "dumps", "loads"]
+
+# bumped whenever the encoding of a node changes
+VERSION = 1
+
+NODES: Dict[str, Type[Base]] = {
+    cls.__name__: cls for cls in (
+        Pair, Repeat, Dice, SingleDice, Neg, Add, Sub, Mul, Div,
+        GE, LE, GT, LT, EQ, NE, KeepMax, KeepMin,
+    )
+}
+
+def encode(node: Base) -> Any:
+    if isinstance(node, Integer):
+        return int(node)
+    if isinstance(node, IntegerList):
+        return ["IntegerList", list(node.data)]
+    if isinstance(node, String):
+        return ["String", str(node)]
+    if isinstance(node, Pair):
+        return ["Pair", *map(encode, node.values)]
+    if type(node).__name__ not in NODES:
+        raise ValueError(f"{node.name} can not be serialized")
+    return [node.name, *map(encode, node.operands)] # type: ignore
+
+def arity(cls: Type[Base]) -> Tuple[int, Optional[int]]:
+    """
+    return:
+        Tuple[int, Optional[int]]: fewest and most operands of cls
+    """
+    if cls is Repeat or issubclass(cls, PairAssociation):
+        return 2, 2
+    if issubclass(cls, RightUnaryAssociation):
+        return 1, 1
+    return 2, None
+
+def integer(value: Any) -> bool:
+    # json gives bool for true / false, which int() would take
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def decode(value: Any) -> Base:
+    """
+    Tree of an encoded value, checking every node on the way
+    since the payload may come from another process
+    return:
+        Base
+    """
+    if integer(value):
+        return Integer(value)
+    if not isinstance(value, list) or not value:
+        raise ValueError(f"not a serialized node {value!r}")
+
+    name, *args = value
+    if name == "IntegerList":
+        if len(args) != 1 or not isinstance(args[0], list) \
+                or not all(map(integer, args[0])):
+            raise ValueError("IntegerList takes one list of integers")
+        return IntegerList(args[0])
+    if name == "String":
+        if len(args) != 1 or not isinstance(args[0], str):
+            raise ValueError("String takes one string")
+        return String(args[0])
+
+    cls = NODES.get(name) if isinstance(name, str) else None
+    if cls is None:
+        raise ValueError(f"unknown node {name!r}")
+    fewest, most = arity(cls)
+    if len(args) < fewest or (most is not None and len(args) > most):
+        raise ValueError(f"{name} can not take {len(args)} operands")
+    operands: List[Base] = [decode(arg) for arg in args]
+    return cls(*operands)
+
+def dumps(tree: Any) -> bytes:
+    """
+    Compact versioned encoding of a parsed or compiled tree,
+    nodes are [name, *operands] and integers themselves
+    return:
+        bytes
+    ex) dumps(parse("3d6k2")) -> b'[1,["KeepMax",["Dice",3,6],2]]'
+    """
+    # Compiled keeps the tree it was lowered from
+    tree = getattr(tree, "tree", tree)
+    return json.dumps(
+        [VERSION, encode(tree)], separators=(",", ":")
+    ).encode()
+
+def loads(data: Union[bytes, str]) -> Base:
+    """
+    Tree encoded by dumps, built without the grammar
+    return:
+        Base
+    ex) loads(b'[1,["Dice",3,6]]') -> Dice(3, 6)
+    """
+    try:
+        version, tree = json.loads(data)
+    except (TypeError, ValueError):
+        raise ValueError("not a serialized tree") from None
+    if not integer(version) or version != VERSION:
+        raise ValueError(f"unsupported serialization version {version!r}")
+    return decode(tree)
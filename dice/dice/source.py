@@ -0,0 +1,161 @@
+import random
+import sys
+from typing import Any, List, Optional
+
+__all__ = ["Source", "RandomSource", "NumpySource", "as_source"]
+
+# bytes per drawn word and the memoryview format reading it
+WORDS = [(1, "B"), (2, "H"), (4, "I"), (8, "Q")]
+# largest seed drawn for a lazy pool, within int64 for numpy sources
+SEED = 2 ** 63 - 1
+
+class Source:
+    """
+    Random numbers used while rolling dice.
+
+    Subclass it and override randint for a custom source; rolls draws
+    one die at a time unless a bulk path is overridden as well.
+    Large pools are rolled lazily only by sources that override seed
+    and replay, any other source rolls every die eagerly.
+    """
+    def randint(self, low: int, high: int) -> int:
+        raise NotImplementedError(
+            f"{type(self).__name__} source is not implemented randint"
+        )
+
+    def rolls(self, amount: int, low: int, high: int) -> List[int]:
+        """
+        amount uniform integers within [low, high]
+        return:
+            List[int]
+        ex) RandomSource(random.Random(1)).rolls(3, 1, 6) -> [3, 1, 6]
+        """
+        if amount <= 0:
+            return []
+        check(low, high)
+        randint = self.randint
+        return [randint(low, high) for _ in range(amount)]
+
+    def seed(self) -> Optional[int]:
+        """
+        Seed of a lazy pool drawn from this source,
+        None when the source can not replay its dice
+        return:
+            Optional[int]
+        """
+        return None
+
+    def replay(self, seed: int) -> "Source":
+        """
+        New source drawing the dice of the pool seeded with seed
+        return:
+            Source
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} source can not replay a pool"
+        )
+
+class RandomSource(Source):
+    """
+    random.Random (or the random module itself) as a source.
+    Bulk rolls take one getrandbits call per batch of dice and reject
+    words outside the range, so every face stays exactly uniform.
+    """
+    def __init__(self, generator: Any = random):
+        self.generator = generator
+
+    def randint(self, low: int, high: int) -> int:
+        return self.generator.randint(low, high)
+
+    def rolls(self, amount: int, low: int, high: int) -> List[int]:
+        if amount <= 0:
+            return []
+        check(low, high)
+
+        span = high - low + 1
+        if span == 1:
+            return [low] * amount
+
+        bits = (span - 1).bit_length()
+        word = next((w for w in WORDS if w[0] * 8 >= bits), None)
+        if word is None:
+            return super().rolls(amount, low, high)
+
+        size, code = word
+        mask = (1 << bits) - 1
+        getrandbits = self.generator.getrandbits
+        result: List[int] = []
+        while len(result) < amount:
+            need = amount - len(result)
+            # expected draws for need dice plus some slack
+            count = need * (mask + 1) // span + 8
+            data = getrandbits(count * size * 8).to_bytes(
+                count * size, sys.byteorder
+            )
+            result.extend([
+                low + x for x in (
+                    y & mask for y in memoryview(data).cast(code)
+                ) if x < span
+            ])
+        del result[amount:]
+        return result
+
+    def seed(self) -> Optional[int]:
+        # a subclass may draw its dice in another way
+        if type(self) is not RandomSource:
+            return None
+        return self.rolls(1, 0, SEED)[0]
+
+    def replay(self, seed: int) -> "RandomSource":
+        return RandomSource(random.Random(seed))
+
+class NumpySource(Source):
+    """numpy.random.Generator as a source, bulk rolls in one call"""
+    def __init__(self, generator: Any):
+        self.generator = generator
+
+    def randint(self, low: int, high: int) -> int:
+        return int(self.generator.integers(low, high, endpoint=True))
+
+    def rolls(self, amount: int, low: int, high: int) -> List[int]:
+        if amount <= 0:
+            return []
+        check(low, high)
+        return self.generator.integers(
+            low, high, size=amount, endpoint=True
+        ).tolist()
+
+    def seed(self) -> Optional[int]:
+        if type(self) is not NumpySource:
+            return None
+        return self.rolls(1, 0, SEED)[0]
+
+    def replay(self, seed: int) -> "NumpySource":
+        from numpy.random import default_rng
+        return NumpySource(default_rng(seed))
+
+def check(low: int, high: int):
+    if low > high:
+        raise ValueError(f"empty range for randint ({low}, {high + 1})")
+
+def as_source(rng: Optional[Any] = None) -> Source:
+    """
+    Source for whatever a caller passed as rng
+    None: the random module, reproducible by random.seed
+    int: a new random.Random seeded with it
+    random.Random / numpy Generator / Source: used as is
+    return:
+        Source
+    ex) as_source(1).rolls(3, 1, 6) -> [3, 1, 6]
+    """
+    if rng is None:
+        return RandomSource()
+    if isinstance(rng, Source):
+        return rng
+    if isinstance(rng, int):
+        return RandomSource(random.Random(rng))
+    if hasattr(rng, "integers"):
+        return NumpySource(rng)
+    if hasattr(rng, "getrandbits"):
+        return RandomSource(rng)
+    raise TypeError(f"{type(rng).__name__} can not be used as a random source")
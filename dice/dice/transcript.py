@@ -0,0 +1,173 @@
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+from dice.dice.element import IntegerList
+from dice.dice.recorder import Event, Recorder
+
+__all__ = ["BoundedRecorder"]
+
+ELLIPSIS = "…"
+DICE = ("Dice", "SingleDice")
+# bytes kept free for the summary line
+RESERVE = 48
+
+def size(text: str) -> int:
+    return len(text.encode())
+
+class Clipped:
+    """
+    List of results formatted within room bytes,
+    the values that do not fit are counted instead of formatted
+    """
+    def __init__(self, values: Sequence[Any], room: int):
+        self.values = values
+        self.room = room
+        self.hidden = 0
+
+    def __format__(self, spec: str) -> str:
+        parts: List[str] = []
+        used = 2
+        for i, x in enumerate(self.values):
+            text = str(x)
+            used += size(text) + 2
+            if used > self.room:
+                self.hidden = len(self.values) - i
+                parts.append(f"{ELLIPSIS}{self.hidden} more")
+                break
+            parts.append(text)
+        return "[" + ", ".join(parts) + "]"
+
+class BoundedRecorder(Recorder):
+    """
+    Recorder rendering its transcript while the evaluation proceeds,
+    within a budget of limit bytes (lines joined by one byte each,
+    summary included).
+
+    Every line is formatted when it is recorded and handed to sink, so a
+    caller can send the transcript in chunks. Once the budget is spent
+    the rest is only counted, and summary tells how much was left out.
+    ex) BoundedRecorder(100) after 1000d6 ->
+        ["1000d6 -> [3, 1, …970 more] **3512**", "…and 970 more dice"]
+    """
+    def __init__(
+        self,
+        limit: int = 2000,
+        sink: Optional[Callable[[str], Any]] = None,
+        detail: bool = True
+    ):
+        self.limit = limit
+        self.sink = sink
+        super().__init__(detail)
+
+    def clear(self):
+        super().clear()
+        self.used = 0
+        self.full = False
+        self.hidden_dice = 0
+        self.hidden_steps = 0
+        self.finished = False
+
+    def write(self, line: Union[Event, str]):
+        if self.full:
+            self.hide(line)
+            return
+
+        # one byte for the separator in front of every line but the first
+        room = self.limit - RESERVE - self.used - (1 if self.events else 0)
+        text = self.render(line, room)
+        if size(text) > room:
+            self.full = True
+            text = self.cut(text, room)
+            if not text:
+                self.hide(line)
+                return
+
+        self.used += size(text) + (1 if self.events else 0)
+        self.events.append(text)
+        if self.sink is not None:
+            self.sink(text)
+
+    def render(self, line: Union[Event, str], room: int) -> str:
+        if not isinstance(line, Event):
+            return line
+
+        keys = [k for k, v in line.outcome.items() if isinstance(v, IntegerList)]
+        if not keys:
+            return str(line)
+
+        # lists share whatever the rest of the line leaves
+        outcome = dict(line.outcome)
+        for key in keys:
+            outcome[key] = Clipped(outcome[key], 0)
+        rest = size(str(line._replace(outcome=outcome)))
+        share = max(room - rest, 0) // len(keys)
+
+        clipped = []
+        for key in keys:
+            outcome[key] = Clipped(line.outcome[key], share)
+            clipped.append(outcome[key])
+        text = str(line._replace(outcome=outcome))
+
+        hidden = max((c.hidden for c in clipped), default=0)
+        if hidden:
+            self.full = True
+            if line.name in DICE:
+                self.hidden_dice += hidden
+        return text
+
+    def cut(self, text: str, room: int) -> str:
+        """Longest prefix of text ending in an ellipsis within room bytes"""
+        room -= size(ELLIPSIS)
+        if room <= 0:
+            return ""
+        return text.encode()[:room].decode(errors="ignore") + ELLIPSIS
+
+    def hide(self, line: Union[Event, str]):
+        if not isinstance(line, Event):
+            return
+        if line.name in DICE:
+            self.hidden_dice += len(line.outcome["result"])
+        else:
+            self.hidden_steps += 1
+
+    @property
+    def summary(self) -> Optional[str]:
+        """
+        return:
+            Optional[str]: what was left out, None when nothing was
+        ex) "…and 940 more dice"
+        """
+        parts = []
+        if self.hidden_dice:
+            parts.append(f"{self.hidden_dice} more dice")
+        if self.hidden_steps:
+            steps = "step" if self.hidden_steps == 1 else "steps"
+            parts.append(f"{self.hidden_steps} more {steps}")
+        if not parts:
+            return None
+        return f"{ELLIPSIS}and " + " and ".join(parts)
+
+    def finish(self) -> Optional[str]:
+        """
+        Hand the summary to sink once the evaluation is over
+        return:
+            Optional[str]: summary
+        """
+        summary = self.summary
+        if summary is not None and self.sink is not None \
+                and not self.finished:
+            self.sink(summary)
+        self.finished = True
+        return summary
+
+    def lines(self) -> List[str]:
+        summary = self.summary
+        return self.events + ([summary] if summary is not None else [])
+
+    def __len__(self) -> int:
+        return len(self.lines())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.lines()[index]
+
+    def __iter__(self):
+        return iter(self.lines())
@@ -0,0 +1,73 @@
+from time import perf_counter
+from typing import Any, List, Tuple
+
+from dice.dice.profile import profiler
+
+__all__ = ["walk"]
+
+def walk(root: Any, context: Any) -> Any:
+    """
+    Evaluate root with an explicit stack of the nodes' steps instead of
+    recursion, so the depth of the tree is not bounded by the stack of
+    the thread. Results, transcript, budget checks, trace spans and
+    profiler stats are the same as those of root.evaluate(context).
+    return:
+        Base
+    ex) walk(parse("1d6+1"), Context(iterative=True)) -> 4
+    """
+    budget, tracer = context.budget, context.tracer
+    untraced = context.recorder is None
+    timed = profiler.enabled
+    # node, its steps and when it was entered
+    stack: List[Tuple[Any, Any, float]] = []
+    node, value = root, None
+    while True:
+        try:
+            if node is not None:
+                if budget is not None:
+                    budget.node()
+                if tracer is not None:
+                    tracer.enter(node)
+                start = perf_counter() if timed else 0.0
+                if node.leaf:
+                    done, value, node = node, node, None
+                else:
+                    if untraced:
+                        steps = node._untraced_steps(context)
+                    else:
+                        steps = node._steps(context)
+                    stack.append((node, steps, start))
+                    node = next(steps)
+                    continue
+            else:
+                node = stack[-1][1].send(value)
+                continue
+        except StopIteration as stop:
+            done, _, start = stack.pop()
+            value = stop.value
+        except BaseException as e:
+            # every open node fails with the innermost one
+            while stack:
+                done, steps, start = stack.pop()
+                if isinstance(e, Exception):
+                    # raised within the steps, as by the recursive driver
+                    try:
+                        steps.throw(e)
+                    except Exception:
+                        pass
+                steps.close()
+                if timed:
+                    profiler.observe(
+                        "evaluate", done.name, perf_counter() - start
+                    )
+                if tracer is not None:
+                    tracer.fail(done, e)
+            raise
+
+        if timed:
+            profiler.observe("evaluate", done.name, perf_counter() - start)
+        if tracer is not None:
+            tracer.leave(done, value)
+        if not stack:
+            return value
+        node = None
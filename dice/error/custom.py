@@ -3,6 +3,8 @@ __all__ = [
     "ShapeException",
     "ShapeOverException",
     "AmountOverException",
+    "CostOverException",
+    "BudgetOverException",
 ]
 
 class RangeException(Exception):
@@ -17,3 +19,8 @@ class ShapeOverException(Exception):
 class AmountOverException(Exception):
     ...
 
+class CostOverException(Exception):
+    ...
+
+class BudgetOverException(Exception):
+    ...
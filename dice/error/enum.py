@@ -15,3 +15,5 @@ class Error(Enum):
 
     ShapeOverException = f"shape over"
     AmountOverException = f"count over"
+    CostOverException = f"cost over"
+    BudgetOverException = f"budget over"
@@ -0,0 +1,46 @@
+"""
+Repeated evaluation through the interpreter against compiled closures.
+Both write no transcript, compiled closures never do, so the speedup
+is the cost of dispatch alone (see evaluate_untraced in suite).
+
+usage) python -m benchmark.bench_compile   (from tests/)
+"""
+import sys
+import timeit
+
+from dice.dice import Context
+from dice.dice.parser import parse
+
+sys.setrecursionlimit(15000)
+
+CASES = {
+    "dice": "1d20",
+    "keep": "4d6k3",
+    "calc": "3d6+2*3+1d4-2",
+    "pair": "1d(10, 20)+5",
+    "repeat": "6n(4d6k3)",
+    "complex": "(5d6)n(2n((((2*3)d6 > 3)l3)d6))",
+}
+
+def main(number: int = 2000):
+    print(f"{'case':<10}{'evaluate':>14}{'compiled':>14}{'speedup':>10}")
+    for name, string in CASES.items():
+        tree = parse(string, "pratt")
+        compiled = tree.compile()
+
+        slow = min(timeit.repeat(
+            lambda: tree.evaluate(Context(trace=False)),
+            number=number, repeat=5
+        )) / number
+        fast = min(timeit.repeat(
+            lambda: compiled(Context(trace=False)),
+            number=number, repeat=5
+        )) / number
+        print(
+            f"{name:<10}{slow * 1e6:>12.1f}us{fast * 1e6:>12.1f}us"
+            f"{slow / fast:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Import time of the package entry points measured by -X importtime,
+checked against a budget so startup regressions show up.
+
+usage) python -m benchmark.bench_import [--repeat 7]   (from tests/)
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# statement -> budget in seconds, about 1.5x of a warm run;
+# the grammar and pyparsing used to add 40ms to the parse import
+BUDGETS: Dict[str, float] = {
+    "import dice.dice": 0.075,
+    "from dice.dice import parse": 0.075,
+    "import dice.dice.runtime": 0.075,
+}
+
+# first parse of a fresh process, grammar construction included
+FIRST_PARSE = 0.150
+
+def importtime(statement: str) -> float:
+    """
+    return:
+        float: seconds of every top level import of statement
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], cwd=TESTS,
+        capture_output=True, text=True, check=True
+    ).stderr
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # nested imports are indented below the one importing them
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1e6
+
+def first_parse() -> float:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "from dice.dice import parse\n"
+        "parse('4d6k3')\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    return float(subprocess.run(
+        [sys.executable, "-c", code], cwd=TESTS,
+        capture_output=True, text=True, check=True
+    ).stdout)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    over = 0
+    results = {
+        statement: (
+            min(importtime(statement) for _ in range(args.repeat)), budget
+        )
+        for statement, budget in BUDGETS.items()
+    }
+    results["first parse"] = (
+        min(first_parse() for _ in range(args.repeat)), FIRST_PARSE
+    )
+    for name, (seconds, budget) in results.items():
+        flag = ""
+        if seconds > budget:
+            flag = " over budget"
+            over += 1
+        print(
+            f"{name:<32}{seconds * 1e3:>8.1f}ms"
+            f"{budget * 1e3:>8.0f}ms{flag}"
+        )
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Keep highest/lowest: heap selection against the old remove loop,
+over pool sizes up to MAXAMOUNT.
+
+usage) python -m benchmark.bench_keep   (from tests/)
+"""
+import random
+import timeit
+
+from dice.dice import Context
+from dice.dice.element import Integer, IntegerList, KeepMax, MAXAMOUNT
+from dice.dice.recorder import Recorder
+
+SIZES = [10, 100, 1000, MAXAMOUNT - 1]
+
+def remove_loop(values, amount):
+    result = list(values)
+    while len(result) > amount:
+        result.remove(min(result))
+    return result
+
+def main(number: int = 5):
+    rng = random.Random(0)
+    print(
+        f"{'size':>6}{'amount':>7}{'loop':>12}{'function':>12}"
+        f"{'evaluate':>12}{'speedup':>10}"
+    )
+    for size in SIZES:
+        pool = IntegerList(Integer(rng.randint(1, 6)) for _ in range(size))
+        for amount in (1, size // 2, size - 1):
+            tree = KeepMax(pool, Integer(amount))
+            # the old loop is quadratic, time it once on large pools
+            loops = 1 if size > 1000 else number
+
+            slow = min(timeit.repeat(
+                lambda: remove_loop(pool, amount), number=loops, repeat=1
+            )) / loops
+            fast = min(timeit.repeat(
+                lambda: tree.function(pool, amount),
+                number=number, repeat=3
+            )) / number
+            full = min(timeit.repeat(
+                lambda: tree.evaluate(Context(Recorder())),
+                number=number, repeat=3
+            )) / number
+            print(
+                f"{size:>6}{amount:>7}{slow * 1e3:>10.2f}ms"
+                f"{fast * 1e3:>10.2f}ms{full * 1e3:>10.2f}ms"
+                f"{slow / fast:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
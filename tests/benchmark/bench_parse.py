@@ -0,0 +1,42 @@
+"""
+Parse latency of the pyparsing grammar against the pratt backend.
+
+usage) python -m benchmark.bench_parse   (from tests/)
+"""
+import sys
+import timeit
+
+from pyparsing import ParserElement
+from dice.dice.parser import parse
+
+sys.setrecursionlimit(15000)
+
+CASES = {
+    "number": "6",
+    "dice": "1d20",
+    "keep": "4d6k3",
+    "calc": "4+2*3",
+    "pair": "1d(10, 20)+5",
+    "complex": "(5d6)n(2n((((2*3)d6 > 3)l3)d6))",
+}
+
+def measure(string: str, backend: str, number: int) -> float:
+    def run():
+        # every call is a fresh string for the packrat memo
+        ParserElement.reset_cache()
+        parse(string, backend)
+    return min(timeit.repeat(run, number=number, repeat=5)) / number
+
+def main(number: int = 200):
+    print(f"{'case':<10}{'pyparsing':>14}{'pratt':>14}{'speedup':>10}")
+    for name, string in CASES.items():
+        slow = measure(string, "pyparsing", number)
+        fast = measure(string, "pratt", number)
+        print(
+            f"{name:<10}{slow * 1e6:>12.1f}us{fast * 1e6:>12.1f}us"
+            f"{slow / fast:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Evaluation with the transcript read as text, recorded but never read,
+and with tracing off.
+
+usage) python -m benchmark.bench_trace   (from tests/)
+"""
+import sys
+import timeit
+
+from dice.dice import Context
+from dice.dice.parser import parse
+from dice.dice.recorder import Recorder
+
+sys.setrecursionlimit(15000)
+
+CASES = {
+    "dice": "1d20",
+    "keep": "4d6k3",
+    "repeat": "6n(4d6k3)",
+    "large": "1000d6k10",
+    "complex": "(5d6)n(2n((((2*3)d6 > 3)l3)d6))",
+}
+
+def read(tree):
+    recorder = Recorder()
+    tree.evaluate(Context(recorder))
+    return "\n".join(recorder)
+
+def main(number: int = 500):
+    print(f"{'case':<10}{'text':>12}{'events':>12}{'untraced':>12}")
+    for name, string in CASES.items():
+        tree = parse(string, "pratt")
+        timings = [
+            min(timeit.repeat(function, number=number, repeat=5)) / number
+            for function in (
+                lambda: read(tree),
+                lambda: tree.evaluate(Context(Recorder())),
+                lambda: tree.evaluate(Context(trace=False)),
+            )
+        ]
+        print(f"{name:<10}" + "".join(f"{t * 1e6:>10.1f}us" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark suite over the test fixtures and stress cases near
+MAXAMOUNT/MAXSHAPE, results are written as JSON to compare commits.
+
+usage) python -m benchmark.suite [--out result.json] [--quick]   (from tests/)
+       python -m benchmark.suite --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+import testdice.conftest as conftest
+from dice.dice import Context, ParseCache, parse
+from dice.dice.element import MAXAMOUNT, MAXSHAPE
+from dice.dice.recorder import Recorder
+
+sys.setrecursionlimit(15000)
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STRESS = {
+    "stress_amount": f"{MAXAMOUNT - 1}d6",
+    "stress_shape": f"100d{MAXSHAPE - 1}",
+    "stress_keep": f"{MAXAMOUNT - 1}d{MAXSHAPE - 1}k1",
+    "stress_repeat": f"{MAXAMOUNT - 1}n1d6",
+    "stress_nested": "100n(100d6k50)",
+}
+
+# relative change reported by --compare as a regression
+THRESHOLD = 0.10
+
+def cases() -> Dict[str, str]:
+    """
+    Expressions of every normal_* fixture of conftest and the stress cases
+    return:
+        Dict[str, str]
+    """
+    result = {}
+    for name in dir(conftest):
+        if name.startswith("normal_"):
+            fixture = getattr(conftest, name)
+            result[name[len("normal_"):]] = fixture.__wrapped__()
+    result.update(STRESS)
+    return result
+
+def best(function: Callable, number: int, repeat: int = 5) -> float:
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+def number_for(function: Callable, budget: float = 0.05) -> int:
+    """calls of function taking about budget seconds"""
+    start = time.perf_counter()
+    function()
+    spent = time.perf_counter() - start
+    return max(1, min(10000, int(budget / max(spent, 1e-9))))
+
+def parse_cold(string: str) -> Tuple[float, float]:
+    """
+    Building the grammar and the first parse with it, timed apart
+    in a fresh interpreter. The grammar is built on the first parse,
+    the old parse_cold metric (grammar built at import) measured only
+    the second part and is not compared with these.
+    return:
+        Tuple[float, float]: grammar_build, parse_first seconds
+    """
+    code = (
+        "import sys, time\n"
+        "sys.setrecursionlimit(15000)\n"
+        "from dice.dice import parse\n"
+        "from dice.dice.parser import expression\n"
+        "start = time.perf_counter()\n"
+        "expression.get()\n"
+        "built = time.perf_counter()\n"
+        f"parse({string!r})\n"
+        "print(built - start, time.perf_counter() - built)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=TESTS,
+        capture_output=True, text=True, check=True
+    )
+    build, first = map(float, output.stdout.split())
+    return build, first
+
+def import_time(repeat: int = 5) -> float:
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import dice.dice\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    return min(
+        float(subprocess.run(
+            [sys.executable, "-c", code], cwd=TESTS,
+            capture_output=True, text=True, check=True
+        ).stdout)
+        for _ in range(repeat)
+    )
+
+def peak(function: Callable) -> int:
+    """peak bytes allocated by function"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def read(tree) -> Recorder:
+    recorder = Recorder()
+    tree.evaluate(Context(recorder, rng=1))
+    return recorder
+
+def measure(string: str, quick: bool) -> Dict[str, float]:
+    repeat = 2 if quick else 5
+    tree = parse(string)
+    compiled = tree.compile()
+    cache = ParseCache()
+
+    traced = lambda: tree.evaluate(Context(Recorder(), rng=1))
+    text = lambda: "\n".join(read(tree))
+    untraced = lambda: tree.evaluate(Context(trace=False, rng=1))
+    run = lambda: compiled(Context(trace=False, rng=1))
+
+    result = {}
+    for key, function in [
+        # pyparsing's packrat memo is warm within every parse
+        ("parse_warm", lambda: parse(string)),
+        ("parse_pratt", lambda: parse(string, "pratt")),
+        ("parse_cached", lambda: cache.parse(string)),
+        ("evaluate_traced", traced),
+        ("evaluate_text", text),
+        ("evaluate_untraced", untraced),
+        ("evaluate_compiled", run),
+    ]:
+        result[key] = best(function, number_for(function), repeat)
+
+    if not quick:
+        result["grammar_build"], result["parse_first"] = parse_cold(string)
+    result["memory_traced"] = peak(traced)
+    result["memory_untraced"] = peak(untraced)
+    return result
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=TESTS,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def run(quick: bool = False) -> dict:
+    results = {
+        name: measure(string, quick) for name, string in cases().items()
+    }
+    return {
+        "meta": {
+            "commit": commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "quick": quick,
+            "import_time": import_time(2 if quick else 5),
+        },
+        "cases": cases(),
+        "results": results,
+    }
+
+def compare(old: dict, new: dict) -> int:
+    """
+    Print new/old of every shared metric, metrics missing on either
+    side (renamed like parse_cold) are skipped
+    return:
+        int: number of regressions over THRESHOLD
+    """
+    regressions = 0
+    print(f"{'case':<18}{'metric':<20}{'old':>12}{'new':>12}{'ratio':>8}")
+    for name, metrics in new["results"].items():
+        for key, value in metrics.items():
+            before = old["results"].get(name, {}).get(key)
+            if not before:
+                continue
+            ratio = value / before
+            flag = ""
+            if ratio > 1 + THRESHOLD:
+                flag = " !"
+                regressions += 1
+            print(
+                f"{name:<18}{key:<20}{before:>12.4g}{value:>12.4g}"
+                f"{ratio:>7.2f}x{flag}"
+            )
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default="benchmark.json")
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.load(open(path)) for path in args.compare)
+        sys.exit(1 if compare(old, new) else 0)
+
+    result = run(args.quick)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(f"{'case':<18}{'parse':>10}{'traced':>10}{'untraced':>10}{'peak':>10}")
+    for name, metrics in result["results"].items():
+        print(
+            f"{name:<18}{metrics['parse_warm'] * 1e6:>8.0f}us"
+            f"{metrics['evaluate_traced'] * 1e6:>8.0f}us"
+            f"{metrics['evaluate_untraced'] * 1e6:>8.0f}us"
+            f"{metrics['memory_traced'] / 1024:>8.0f}kB"
+        )
+    print(f"import {result['meta']['import_time'] * 1e3:.1f}ms -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
-from dice.dice import expression, recorder
+from dice.dice import parse_cache, recording
 
 def main():
     string = "5d6L2"
-    tre = expression.parse_string(
-        string, parse_all=True 
-    )
-    result = [x.evaluate() for x in tre][0]
-    print('\n'.join(recorder))
+    tree = parse_cache.parse(string)
+    with recording() as transcript:
+        result = tree.evaluate()
+    print('\n'.join(transcript))
     print(result)
 
 
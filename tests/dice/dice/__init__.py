@@ -1,4 +1,30 @@
-from dice.dice.parser import expression
-from dice.dice.recorder import thread_recorder, recorder
+import importlib
+from typing import Any
 
-__all__ = ["expression", "recorder", "thread_recorder"]
+from dice.dice.recorder import Recorder, recording
+from dice.dice.context import Context
+from dice.dice.budget import Budget
+from dice.dice.transcript import BoundedRecorder
+from dice.dice.chrome import ChromeTrace
+
+__all__ = [
+    "expression", "parse", "Recorder", "recording",
+    "ParseCache", "parse_cache", "Context", "BoundedRecorder", "Budget",
+    "ChromeTrace",
+]
+
+# names needing the grammar (and pyparsing), imported on first use
+GRAMMAR = {
+    "expression": "dice.dice.parser",
+    "parse": "dice.dice.parser",
+    "ParseCache": "dice.dice.cache",
+    "parse_cache": "dice.dice.cache",
+}
+
+def __getattr__(name: str) -> Any:
+    module = GRAMMAR.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -1,65 +1,82 @@
 from abc import ABC, abstractmethod
-from typing import List
-from pyparsing import (
-    ParserElement,
-    OneOrMore,
-    Forward,
-    Suppress,
-)
+from typing import TYPE_CHECKING, List
+
+# the grammar is only built by the parser, elements never need pyparsing
+if TYPE_CHECKING:
+    from pyparsing import ParserElement
 
 class Association(ABC):
-    symbols: List[ParserElement] = []
+    __slots__ = ()
+    symbols: List[str] = []
     extra = None
     @classmethod
     def parse(cls, tokens):
         return cls(*tokens)
-     
+
     @classmethod
     @abstractmethod
-    def get_expression(cls, last: ParserElement) -> ParserElement:
+    def get_expression(cls, last: "ParserElement") -> "ParserElement":
         ...
 
+def alternatives(symbols: List[str]) -> "ParserElement":
+    """
+    return:
+        ParserElement: first of the suppressed symbols that matches
+    """
+    from pyparsing import Suppress
+
+    symbol = Suppress(symbols[0])
+    for s in symbols[1:]:
+        symbol |= Suppress(s)
+    return symbol
+
 class SingleAssociation(Association):
+    __slots__ = ()
     @classmethod
-    def get_expression(cls, last: ParserElement) -> ParserElement:
+    def get_expression(cls, last: "ParserElement") -> "ParserElement":
         return last
 
 class PairAssociation(Association):
+    __slots__ = ()
     @classmethod
-    def get_expression(cls, last: ParserElement) ->ParserElement:
-        left, right = cls.symbols
+    def get_expression(cls, last: "ParserElement") -> "ParserElement":
+        from pyparsing import Suppress
+
+        left, right = (Suppress(s) for s in cls.symbols)
         expr = left+last+Suppress(",")+last+right
         expr.set_parse_action(cls.parse)
 
         return expr
 
 class RightUnaryAssociation(Association):
+    __slots__ = ()
     @classmethod
-    def get_expression(cls, last: ParserElement) -> ParserElement:
+    def get_expression(cls, last: "ParserElement") -> "ParserElement":
+        from pyparsing import Forward
+
         this = Forward()
         new_this = (this | cls.extra) if cls.extra else this
-        
-        symbol = cls.symbols[0]
-        for s in cls.symbols[1:]:
-            symbol |= s
+
+        symbol = alternatives(cls.symbols)
 
         expr = symbol + new_this
         expr.set_parse_action(cls.parse)
-        
+
         this <<= expr | last
         last = this
         return last
 
 class LeftBinaryAssociation(Association):
+    __slots__ = ()
     @classmethod
-    def get_expression(cls, last: ParserElement) -> ParserElement:
-        this: ParserElement = Forward()
-        expr: ParserElement = Forward()
+    def get_expression(cls, last: "ParserElement") -> "ParserElement":
+        from pyparsing import Forward, OneOrMore
+
+        this: "ParserElement" = Forward()
+        expr: "ParserElement" = Forward()
         new_last = (last | cls.extra) if cls.extra else last
-        
-        symbol = cls.symbols[0]
-        for s in cls.symbols[1:]:
-            symbol |= s
+
+        symbol = alternatives(cls.symbols)
 
         expr = last + OneOrMore(symbol + new_last)
         expr.set_parse_action(cls.parse)
@@ -67,4 +84,3 @@ class LeftBinaryAssociation(Association):
         this <<= expr | last
         last = this
         return last
-
@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import NamedTuple
+
+from dice.dice.element import Base
+from dice.dice.parser import parse, backends
+
+__all__ = ["CacheInfo", "ParseCache", "parse_cache"]
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+class ParseCache:
+    """
+    Bounded LRU cache of parsed expression trees keyed by input string.
+
+    The stored tree is shared by every caller; evaluation keeps its
+    per-roll state in a Context, so the tree may be evaluated by
+    several threads at once and holds nothing between rolls.
+    """
+    def __init__(
+        self,
+        maxsize: int = 256,
+        backend: str = "pyparsing",
+        optimize: bool = False
+    ):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if backend not in backends:
+            raise ValueError(f"unknown parser backend {backend!r}")
+
+        self.backend: str = backend
+        self.optimize: bool = optimize
+        self.maxsize: int = maxsize
+        self.trees: "OrderedDict[str, Base]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.trees)
+
+    def parse(self, string: str) -> Base:
+        """
+        Parse string, reusing the tree of a previous call if possible
+        return:
+            Base
+        ex) ParseCache().parse("3d6") -> Dice(3, 6)
+        """
+        with self.lock:
+            tree = self.trees.get(string)
+            if tree is not None:
+                self.trees.move_to_end(string)
+                self.hits += 1
+                return tree
+            self.misses += 1
+
+        # Parsing can be slow, so it runs outside of the lock.
+        # Failed parses raise here and are never stored.
+        tree = parse(string, self.backend, self.optimize)
+
+        with self.lock:
+            self.trees[string] = tree
+            self.trees.move_to_end(string)
+            while len(self.trees) > self.maxsize:
+                self.trees.popitem(last=False)
+                self.evictions += 1
+
+        return tree
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions,
+                self.maxsize, len(self.trees)
+            )
+
+    def resize(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.trees) > self.maxsize:
+                self.trees.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.trees.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+parse_cache = ParseCache()
@@ -0,0 +1,374 @@
+import operator
+from typing import Any, Callable, List, Optional, Tuple
+
+from dice.error.custom import *
+from dice.dice.context import Context
+from dice.dice.profile import profiler
+from dice.dice.element import *
+from dice.dice.element import (
+    Base, Operator, LAZY, MAXAMOUNT, MAXSHAPE, keep, roll_pool
+)
+
+__all__ = ["Compiled", "compile_tree"]
+
+# Kinds of raw values passed between compiled closures
+SCALAR = "scalar" # int
+POOL = "pool"     # List[int]
+PAIR = "pair"     # Tuple[int, int]
+
+Closure = Callable[[Context], Any]
+Lowered = Tuple[Closure, str]
+
+COMPARISONS = {
+    GE: operator.ge, LE: operator.le,
+    GT: operator.gt, LT: operator.lt,
+    EQ: operator.eq, NE: operator.ne,
+}
+
+class Compiled:
+    """
+    Tree lowered into nested closures over plain ints and lists.
+
+    Calling it rolls the expression like tree.evaluate() does, consuming
+    random numbers in the same order, but skips per-node dispatch.
+    Closures record no transcript, trace no spans and have no nodes to
+    count: a context with a recorder, a tracer or a budget limiting
+    nodes has the whole tree evaluated by the interpreter instead.
+    """
+    def __init__(self, tree: Base, function: Closure, kind: str):
+        self.tree = tree
+        self.function = function
+        self.kind = kind
+
+    def __repr__(self) -> str:
+        return f"Compiled({self.tree!r})"
+
+    def __call__(self, context: Optional[Context] = None) -> Base:
+        """
+        return:
+            Base: same type evaluate would return
+        ex) compile_tree(Dice(3, 6))() -> [2, 5, 1]
+        """
+        if context is None:
+            context = Context(trace=False)
+        budget = context.budget
+        if context.recorder is not None or context.tracer is not None \
+                or (budget is not None and budget.nodes is not None):
+            return self.tree.evaluate(context)
+        return wrap(self.function(context), self.kind)
+
+def compile_tree(tree: Base) -> Compiled:
+    """
+    return:
+        Compiled
+    ex) compile_tree(parse("4d6k3"))() -> [6, 4, 3]
+    """
+    function, kind = lower(tree)
+    return Compiled(tree, function, kind)
+
+def wrap(value: Any, kind: str) -> Base:
+    if kind == SCALAR:
+        return Integer(value)
+    if kind == PAIR:
+        return Pair(Integer(value[0]), Integer(value[1]))
+    return IntegerList(value)
+
+def unwrap(value: Base) -> Any:
+    if isinstance(value, Pair):
+        return (int(value[0]), int(value[1]))
+    if isinstance(value, IntegerList):
+        return [int(x) for x in value]
+    return int(value)
+
+def kind_of(node: Base) -> str:
+    if isinstance(node, Pair):
+        return PAIR
+    if isinstance(node, Neg):
+        # Neg iterates anything that is not an Integer
+        return SCALAR if kind_of(node.operands[0]) == SCALAR else POOL
+    if isinstance(node, (Integer, Add, Sub, Mul, Div)):
+        return SCALAR
+    return POOL
+
+def lower(node: Base) -> Lowered:
+    if isinstance(node, Integer):
+        value = int(node)
+        return (lambda context: value), SCALAR
+
+    lowering = LOWERINGS.get(type(node))
+    lowered = lowering(node) if lowering else None
+    if lowered is None:
+        return interpret(node)
+    return lowered
+
+def interpret(node: Base) -> Lowered:
+    """Shapes the compiler does not specialize run through evaluate."""
+    def f(context: Context) -> Any:
+        return unwrap(node.evaluate(context))
+    return f, kind_of(node)
+
+def constant(node: Base) -> Optional[int]:
+    return int(node) if isinstance(node, Integer) else None
+
+def has_pair(nodes: List[Base]) -> bool:
+    """
+    int(Pair) fails only after every operand was evaluated,
+    such nodes are left to the interpreter to fail the same way.
+    """
+    return any(kind_of(node) == PAIR for node in nodes)
+
+def scalar(node: Base) -> Closure:
+    """Closure returning int(...) of node, the way arithmetic sees it"""
+    function, kind = lower(node)
+    if kind == SCALAR:
+        return function
+    return lambda context: sum(function(context))
+
+def terms(node: Base, sign: int, out: List[Tuple[int, Base]]):
+    """Flatten nested Add/Sub/Neg into signed terms, in evaluation order"""
+    if isinstance(node, Add):
+        for operand in node.operands:
+            terms(operand, sign, out)
+    elif isinstance(node, Sub):
+        first, *rest = node.operands
+        terms(first, sign, out)
+        for operand in rest:
+            terms(operand, -sign, out)
+    elif isinstance(node, Neg) and kind_of(node.operands[0]) != PAIR:
+        terms(node.operands[0], -sign, out)
+    else:
+        out.append((sign, node))
+
+def lower_sum(node: Base) -> Optional[Lowered]:
+    signed: List[Tuple[int, Base]] = []
+    terms(node, 1, signed)
+    if has_pair([term for _, term in signed]):
+        return None
+
+    total = 0
+    ordered: List[Tuple[int, Closure]] = []
+    for sign, term in signed:
+        value = constant(term)
+        if value is not None:
+            total += sign * value
+        else:
+            ordered.append((sign, scalar(term)))
+
+    signs = [sign for sign, _ in ordered]
+    if not ordered:
+        return (lambda context: total), SCALAR
+    if signs == [1]:
+        a = ordered[0][1]
+        return (lambda context: a(context) + total), SCALAR
+    if signs == [1, 1]:
+        a, b = ordered[0][1], ordered[1][1]
+        return (lambda context: a(context) + b(context) + total), SCALAR
+    if signs == [1, -1]:
+        a, b = ordered[0][1], ordered[1][1]
+        return (lambda context: a(context) - b(context) + total), SCALAR
+
+    def f(context: Context) -> int:
+        value = total
+        for sign, function in ordered:
+            value += sign * function(context)
+        return value
+    return f, SCALAR
+
+def factors(node: Base, out: List[Base]):
+    if isinstance(node, Mul):
+        for operand in node.operands:
+            factors(operand, out)
+    else:
+        out.append(node)
+
+def lower_mul(node: Mul) -> Optional[Lowered]:
+    flat: List[Base] = []
+    factors(node, flat)
+    if has_pair(flat):
+        return None
+
+    product = 1
+    functions: List[Closure] = []
+    for factor in flat:
+        value = constant(factor)
+        if value is not None:
+            product *= value
+        else:
+            functions.append(scalar(factor))
+
+    if not functions:
+        return (lambda context: product), SCALAR
+    if len(functions) == 1:
+        (a,) = functions
+        return (lambda context: a(context) * product), SCALAR
+
+    def f(context: Context) -> int:
+        value = product
+        for function in functions:
+            value *= function(context)
+        return value
+    return f, SCALAR
+
+def lower_div(node: Div) -> Optional[Lowered]:
+    if has_pair(node.operands):
+        return None
+    first, *rest = (scalar(operand) for operand in node.operands)
+    if len(rest) == 1:
+        (b,) = rest
+        return (lambda context: first(context) // b(context)), SCALAR
+
+    def f(context: Context) -> int:
+        # every operand is evaluated before the first division
+        value, *divisors = [first(context)] + [g(context) for g in rest]
+        for divisor in divisors:
+            value //= divisor
+        return value
+    return f, SCALAR
+
+def lower_neg(node: Neg) -> Optional[Lowered]:
+    if kind_of(node) == SCALAR:
+        return lower_sum(node)
+    function, _ = lower(node.operands[0])
+    return (lambda context: [-x for x in function(context)]), POOL
+
+def lower_shape(node: Base) -> Closure:
+    """Closure returning (min, max) of a die face"""
+    function, kind = lower(node)
+    if kind == PAIR:
+        return function
+
+    value = constant(node)
+    if value is not None:
+        return lambda context: (1, value)
+
+    shape = scalar(node)
+    return lambda context: (1, shape(context))
+
+def roll(
+    context: Context,
+    amount: int,
+    shape: Tuple[int, int],
+    name: str = "Dice"
+) -> List[int]:
+    min_value, max_value = shape
+    if max_value >= MAXSHAPE:
+        raise ShapeOverException()
+    if context.budget is not None:
+        context.budget.roll(amount)
+    if profiler.enabled:
+        profiler.count("compiled", name, amount)
+    if amount < LAZY:
+        return context.random.rolls(amount, min_value, max_value)
+    # the same dice as the interpreter's pool, lazy or not
+    pool = roll_pool(context.random, amount, min_value, max_value)
+    if isinstance(pool, DicePool):
+        return pool.values()
+    return list(pool.data)
+
+def lower_dice(node: Dice) -> Optional[Lowered]:
+    if len(node.operands) != 2:
+        return None
+    count, shape_node = node.operands
+    if has_pair([count]):
+        return None
+
+    amount = scalar(count)
+    shape = lower_shape(shape_node)
+    def f(context: Context) -> List[int]:
+        n = amount(context)
+        s = shape(context)
+        if n >= MAXAMOUNT:
+            raise AmountOverException()
+        return roll(context, n, s)
+    return f, POOL
+
+def lower_single_dice(node: SingleDice) -> Lowered:
+    shape = lower_shape(node.operands[0])
+    return (
+        lambda context: roll(context, 1, shape(context), "SingleDice")
+    ), POOL
+
+def lower_pair(node: Pair) -> Optional[Lowered]:
+    if len(node.values) != 2 or has_pair(node.values):
+        return None
+    first, second = (scalar(value) for value in node.values)
+    def f(context: Context) -> Tuple[int, int]:
+        pair = (first(context), second(context))
+        if pair[0] > pair[1]:
+            raise RangeException()
+        return pair
+    return f, PAIR
+
+def lower_comparison(node: Operator) -> Optional[Lowered]:
+    compare = COMPARISONS[type(node)]
+    first, *rest = node.operands
+    if has_pair(node.operands):
+        return None
+    left, kind = lower(first)
+    rights = [scalar(operand) for operand in rest]
+    single = kind == SCALAR
+
+    def f(context: Context) -> List[int]:
+        value = left(context)
+        if single:
+            value = [value]
+        for right in rights:
+            y = right(context)
+            value = [int(compare(x, y)) for x in value]
+        return value
+    return f, POOL
+
+def lower_keep(node: Operator) -> Optional[Lowered]:
+    if len(node.operands) != 2:
+        return None
+    pool, count = node.operands
+    if kind_of(pool) != POOL or has_pair([count]):
+        return None
+    values, _ = lower(pool)
+    amount = scalar(count)
+    highest = isinstance(node, KeepMax)
+
+    def f(context: Context) -> List[int]:
+        result = values(context)
+        marks = keep(result, amount(context), highest)
+        return [x for x, kept in zip(result, marks) if kept]
+    return f, POOL
+
+def lower_repeat(node: Repeat) -> Optional[Lowered]:
+    if len(node.operands) != 2:
+        return None
+    count, body_node = node.operands
+    if has_pair(node.operands):
+        return None
+    amount = scalar(count)
+    body = scalar(body_node)
+
+    def f(context: Context) -> List[int]:
+        n = amount(context)
+        if n >= MAXAMOUNT:
+            raise AmountOverException()
+        budget = context.budget
+        if budget is None:
+            return [body(context) for _ in range(n)]
+
+        result = []
+        for _ in range(n):
+            budget.check()
+            result.append(body(context))
+        return result
+    return f, POOL
+
+LOWERINGS = {
+    Add: lower_sum,
+    Sub: lower_sum,
+    Mul: lower_mul,
+    Div: lower_div,
+    Neg: lower_neg,
+    Dice: lower_dice,
+    SingleDice: lower_single_dice,
+    Pair: lower_pair,
+    Repeat: lower_repeat,
+    KeepMax: lower_keep,
+    KeepMin: lower_keep,
+    **{cls: lower_comparison for cls in COMPARISONS},
+}
@@ -1,9 +1,11 @@
+import heapq
 import operator
-import random
+from array import array
+from collections import Counter
 from typing import (
-    Any, List, Callable, Union, Dict,
+    Any, List, Callable, Generator, Iterable, Iterator, NamedTuple,
+    Optional, Union, overload,
 )
-from pyparsing import Literal, Suppress
 
 from dice.error.custom import *
 from dice.dice.association import (
@@ -13,12 +15,18 @@ from dice.dice.association import (
     LeftBinaryAssociation
 )
 
-from dice.dice.recorder import record, recorder
+from dice.dice.budget import Budget
+from dice.dice.context import Context
+from dice.dice.profile import profiler
+from dice.dice.recorder import record
+from dice.dice.source import Source, as_source, check
+from dice.dice.walk import walk
 
 __all__ = [
     "Integer",
     "String",
     "IntegerList",
+    "DicePool",
     "Pair",
     "Repeat",
     "Dice",
@@ -39,17 +47,35 @@ __all__ = [
 ]
 
 Intable = Union["Integer", "IntegerList"]
+Steps = Generator["Base", Any, Any]
 
 
 MAXSHAPE  = 10000
 MAXAMOUNT = 10000
 
+# pools of at least LAZY dice are rolled lazily (see DicePool)
+LAZY = 256
+# dice drawn at a time from the seed of a lazy pool
+CHUNK = 4096
+
 class Base:
     """
-    All element must inherit Base class
+    All element must inherit Base class.
+    Elements are never written to while evaluating;
+    per-roll state lives in the Context.
     """
+    __slots__ = ()
+    # values evaluate to themselves without any steps
+    leaf: bool = False
+
     def __init__(self, *_, **__):
-        self.outcome: Dict[str, "Base"] = {"result": self}
+        ...
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        # _steps without the record decorator, chosen once per node
+        # when nothing is recorded
+        cls._untraced_steps = getattr(cls._steps, "__wrapped__", cls._steps)
 
     @property
     def name(self) -> str:
@@ -61,36 +87,277 @@ class Base:
         """
         return self.__class__.__name__
 
-    def evaluate(self, tid: int = -1) -> "Base":
+    def evaluate(self, context: Optional[Context] = None) -> "Base":
         """
         Evaluate element
         return:
             Base
-        ex) Dice(2, 3).evaluate(tid) -> 2d3
+        ex) Dice(2, 3).evaluate() -> 2d3
+        """
+        if context is None:
+            context = Context()
+        if context.iterative:
+            return walk(self, context)
+        if context.budget is not None:
+            context.budget.node()
+        if context.tracer is not None:
+            return context.tracer.span(self, context)
+        if profiler.enabled:
+            return profiler.measure(
+                "evaluate", self.name, self._evaluate, context
+            )
+        return self._evaluate(context)
+
+    def _evaluate(self, context: Context) -> "Base":
+        """
+        Evaluate element within context by driving its steps,
+        children are evaluated recursively through their evaluate.
+        An error of a child is raised within the steps as well.
+        """
+        if context.recorder is None:
+            steps = self._untraced_steps(context)
+        else:
+            steps = self._steps(context)
+        try:
+            child = next(steps)
+            while True:
+                try:
+                    value = child.evaluate(context)
+                except Exception as e:
+                    child = steps.throw(e)
+                else:
+                    child = steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+    def _steps(self, context: Context) -> Steps:
+        """
+        Evaluation of element as a generator: it yields every child to
+        evaluate, is sent the child's result and returns its own result.
+        The recursive _evaluate and the explicit-stack walk drive the
+        same steps.
         """
         return self
+        yield
+
+    _untraced_steps = _steps
+
+    def compile(self) -> Any:
+        """
+        Lower element into a callable for fast repeated evaluation
+        return:
+            Compiled
+        ex) Dice(2, 3).compile()() -> 2d3
+        """
+        # compiler imports every element class
+        from dice.dice.compiler import compile_tree
+        return compile_tree(self)
 
 class Integer(int, Base, SingleAssociation):
     """int wrapper class"""
-    ...
+    __slots__ = ()
+    leaf = True
+
+    def _evaluate(self, context: Context) -> "Integer":
+        return self
 
 class String(str, Base, SingleAssociation):
     """str wrapper class"""
-    ...
+    __slots__ = ()
+    leaf = True
+
+    def _evaluate(self, context: Context) -> "String":
+        return self
+
 
+class IntegerList(Base, SingleAssociation):
+    """
+    List of Integer backed by a machine-word array,
+    one die takes 8 bytes instead of an Integer object.
+    Values past 64 bits fall back to a list of int.
+    Iterating or indexing it gives Integer, it equals lists
+    of the same values and sums through int().
+    """
+    __slots__ = ("data",)
+    leaf = True
+
+    def __init__(self, values: Iterable[int] = ()):
+        super().__init__()
+        if not isinstance(values, (list, array)):
+            values = list(values)
+        try:
+            self.data: Union[array, List[int]] = array("q", values)
+        except OverflowError:
+            self.data = [int(x) for x in values]
 
-class IntegerList(List[Integer], Base, SingleAssociation): 
-    """List[Base] wrapper class"""
     def __int__(self) -> int:
         """
         return:
             sum of elements
         """
-        return sum(self)
+        return sum(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[Integer]:
+        return map(Integer, self.data)
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.data
+
+    @overload
+    def __getitem__(self, idx: int) -> Integer: ...
+    @overload
+    def __getitem__(self, idx: slice) -> "IntegerList": ...
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return IntegerList(self.data[idx])
+        return Integer(self.data[idx])
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, IntegerList):
+            other = other.data
+        elif not isinstance(other, list):
+            return NotImplemented
+        return len(self.data) == len(other) and all(
+            map(operator.eq, self.data, other)
+        )
+
+    __hash__ = None # type: ignore
+
+    def __repr__(self) -> str:
+        return "[" + ", ".join(map(str, self.data)) + "]"
+
+    def append(self, value: int):
+        try:
+            self.data.append(value)
+        except OverflowError:
+            self.data = list(self.data)
+            self.data.append(int(value))
+
+    def extend(self, values: Iterable[int]):
+        for value in values:
+            self.append(value)
+
+    def remove(self, value: int):
+        self.data.remove(value)
+
+    def count(self, value: int) -> int:
+        return self.data.count(value)
+
+    def index(self, value: int) -> int:
+        return self.data.index(value)
+
+    def _evaluate(self, context: Context) -> "IntegerList":
+        return self
+
+class DicePool(IntegerList):
+    """
+    amount dice within [low, high], rolled only when they are read.
+    The dice are drawn from replay(seed) of the source that drew seed,
+    int() sums them chunk by chunk without keeping them, and reading
+    single dice (iteration, keep, comparisons, the transcript) replays
+    the seed once into data, so the sum and the dice always agree.
+    Writing to the pool keeps data and forgets the seed.
+    ex) int(DicePool(9999, 1, 6, seed, source.replay)) -> 34981
+    """
+    __slots__ = ("amount", "low", "high", "seed", "replay", "total")
+
+    def __init__(
+        self,
+        amount: int,
+        low: int,
+        high: int,
+        seed: int,
+        replay: Callable[[int], Source]
+    ):
+        # data stays unset until a die is read
+        Base.__init__(self)
+        self.amount = amount
+        self.low = low
+        self.high = high
+        self.seed: Optional[int] = seed
+        self.replay = replay
+        self.total: Optional[int] = None
+
+    def chunks(self) -> Iterator[List[int]]:
+        if self.seed is None:
+            yield list(self.data)
+            return
+        source = self.replay(self.seed)
+        left = self.amount
+        while left > 0:
+            yield source.rolls(min(left, CHUNK), self.low, self.high)
+            left -= CHUNK
+
+    def values(self) -> List[int]:
+        """every die of the pool, replayed from its seed"""
+        return [x for chunk in self.chunks() for x in chunk]
+
+    def __getattr__(self, name: str) -> Any:
+        if name != "data":
+            raise AttributeError(name)
+        try:
+            data: Union[array, List[int]] = array("q")
+            for chunk in self.chunks():
+                data.extend(chunk)
+        except OverflowError:
+            data = self.values()
+        self.data = data
+        return data
+
+    def __int__(self) -> int:
+        if self.total is None:
+            self.total = sum(sum(chunk) for chunk in self.chunks())
+        return self.total
+
+    def __len__(self) -> int:
+        return self.amount
+
+    def changed(self):
+        """data was written to, the seed no longer gives the dice"""
+        self.seed = None
+        self.amount = len(self.data)
+        self.total = sum(self.data)
+
+    def append(self, value: int):
+        super().append(value)
+        self.changed()
+
+    def extend(self, values: Iterable[int]):
+        for value in values:
+            super().append(value)
+        self.changed()
+
+    def remove(self, value: int):
+        super().remove(value)
+        self.changed()
+
+def roll_pool(
+    source: Source,
+    amount: int,
+    low: int,
+    high: int
+) -> IntegerList:
+    """
+    amount dice within [low, high] from source,
+    large pools of a source that replays a seed are rolled lazily
+    return:
+        IntegerList
+    ex) roll_pool(as_source(1), 3, 1, 6) -> [2, 1, 5]
+    """
+    if amount >= LAZY:
+        check(low, high)
+        seed = source.seed()
+        if seed is not None:
+            return DicePool(amount, low, high, seed, source.replay)
+    return IntegerList(source.rolls(amount, low, high))
 
 class Pair(Base, PairAssociation):
     """Pair is expression for (min, max)"""
-    symbols=[Suppress("("), Suppress(")")]
+    __slots__ = ("values", "record")
+    symbols = ["(", ")"]
 
     def __init__(self, *value: Any):
         super().__init__()
@@ -106,14 +373,14 @@ class Pair(Base, PairAssociation):
     def __getitem__(self, idx: int) -> Base:
         return self.values[idx]
     
-    def evaluate(self, tid: int = -1) -> "Pair":
+    def _steps(self, context: Context) -> Steps:
         """
         return:
             Pair: Return a pair of the evaluation of each element.
         """
         values = IntegerList()
         for value in self.values:
-            r = value.evaluate(tid)
+            r = yield value
             assert isinstance(r, Integer | IntegerList)
             values.append(
                 Integer(int(r))
@@ -122,15 +389,14 @@ class Pair(Base, PairAssociation):
         if values[0] > values[1]:
             raise RangeException()
 
-        self.outcome["result"] = Pair(*values)
-        return self.outcome["result"] 
+        result = Pair(*values)
+        context.outcome(self)["result"] = result
+        return result
 
 class Repeat(Base, LeftBinaryAssociation):
     """Repeat is repeating evaluable functions"""
-    symbols = [
-        Literal("N").suppress(),
-        Literal("n").suppress(),
-    ]
+    __slots__ = ("operands",)
+    symbols = ["N", "n"]
 
     def __init__(self, *operands: Any):
         super().__init__()
@@ -142,22 +408,41 @@ class Repeat(Base, LeftBinaryAssociation):
         )
         return f"{self.name}({args})"
     
-    @record(recorder, "repeat result -> {result} **{sum}**")
-    def evaluate(self, tid: int = -1) -> IntegerList:
+    @record("repeat result -> {result} **{sum}**")
+    def _steps(self, context: Context) -> Steps:
         amount, evaluable = self.operands
-        amount = amount.evaluate(tid)
+        amount = yield amount
         assert isinstance(amount, Integer | IntegerList)
         if int(amount) >= MAXAMOUNT:
             raise AmountOverException()
 
         result = IntegerList()
+        recorder = context.recorder
+        if recorder is not None:
+            recorder.begin()
         
-        for _ in range(int(amount)):
-            tmp = evaluable.evaluate(tid)
+        budget, tracer = context.budget, context.tracer
+        for i in range(int(amount)):
+            if budget is not None:
+                budget.check()
+            if tracer is None:
+                tmp = yield evaluable
+            else:
+                span = f"{self.name}#{i + 1}"
+                tracer.begin(span)
+                try:
+                    tmp = yield evaluable
+                except Exception as e:
+                    # the span of the iteration closes before Repeat's
+                    tracer.end(span, error=type(e).__name__)
+                    raise
+                tracer.end(span, result=int(tmp))
             assert isinstance(tmp, Integer | IntegerList)
             result.append(Integer(int(tmp)))
+            if recorder is not None:
+                recorder.step(result[-1])
         
-        self.outcome.update(
+        context.outcome(self).update(
             {
                 "result": result,
                 "sum": Integer(int(result))
@@ -167,6 +452,8 @@ class Repeat(Base, LeftBinaryAssociation):
         return result
 
 class Operator(Base):
+    __slots__ = ("operands",)
+
     def __init__(self, *operands: Any):
         super().__init__()
         self.operands: List[Base] = list(operands)
@@ -177,19 +464,20 @@ class Operator(Base):
         )
         return f"{self.name}({args})"
     
-    def evaluate(self, tid: int = -1) -> Base:
-        operands: List = [
-            operand.evaluate(tid) for operand in self.operands
-        ]
+    def _steps(self, context: Context) -> Steps:
+        operands: List = []
+        for operand in self.operands:
+            operands.append((yield operand))
+        function = self.bind(context)
         try:
-            value = self.function(*operands)
+            value = function(*operands)
         except TypeError:
             value = operands[0]
             for operand in operands[1:]:
-                value = self.function(value, operand)
+                value = function(value, operand)
         
-        self.outcome["result"] = value 
-        return self.outcome["result"]
+        context.outcome(self)["result"] = value 
+        return value
 
     @property
     def function(self) -> Callable[..., Base]:
@@ -197,17 +485,24 @@ class Operator(Base):
             f"{self.name} operator is not implemented function"
         )
 
+    def bind(self, context: Context) -> Callable[..., Base]:
+        """
+        function as used within context,
+        operators depending on per-evaluation state override it
+        return:
+            Callable[..., Base]
+        """
+        return self.function
+
 class Dice(Operator, LeftBinaryAssociation):
-    symbols = [
-        Literal("d").suppress(),
-        Literal("D").suppress(),
-    ]
-
-    @record(recorder, "{amount}d{shape} -> {result} **{sum}**")
-    def evaluate(self, tid: int = -1) -> Base:
-        result = super().evaluate(tid)
-        amount = self.operands[0].outcome["result"] 
-        shape = self.operands[1].outcome["result"]
+    __slots__ = ()
+    symbols = ["d", "D"]
+
+    @record("{amount}d{shape} -> {result} **{sum}**")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
+        amount = context.result(self.operands[0]) 
+        shape = context.result(self.operands[1])
         
         if isinstance(amount, Integer | IntegerList):
             amount = Integer(int(amount))
@@ -223,17 +518,30 @@ class Dice(Operator, LeftBinaryAssociation):
         
         if isinstance(shape, Pair) and shape[1] >= MAXSHAPE:
             raise ShapeOverException()
-        assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
+        assert isinstance(result, IntegerList)
+        context.outcome(self).update({
             "amount": amount,
             "shape": shape,
-            "sum": Integer(int(result))
         })
+        if context.recorder is not None:
+            # the transcript shows every die: a lazy pool is rolled once
+            # here instead of being summed and replayed when formatted
+            context.outcome(self)["sum"] = Integer(sum(result.data))
 
         return result 
 
     @property
     def function(self) -> Callable[..., Base]:
+        return self.rolling(as_source())
+
+    def bind(self, context: Context) -> Callable[..., Base]:
+        return self.rolling(context.random, context.budget)
+
+    def rolling(
+        self,
+        source: Source,
+        budget: Optional[Budget] = None
+    ) -> Callable[..., Base]:
         def f(
             amount: Intable, 
             shape: Union[Integer, Pair]
@@ -243,22 +551,23 @@ class Dice(Operator, LeftBinaryAssociation):
                 min_value, max_value = (shape)
             assert isinstance(min_value, Integer | IntegerList)
             assert isinstance(max_value, Integer | IntegerList) 
-            return IntegerList(
-                Integer(random.randint(int(min_value), int(max_value)))
-                for _ in range(int(amount))
+            if budget is not None:
+                budget.roll(int(amount))
+            if profiler.enabled:
+                profiler.count("evaluate", self.name, int(amount))
+            return roll_pool(
+                source, int(amount), int(min_value), int(max_value)
             )
         return f 
 
 class SingleDice(Operator, RightUnaryAssociation):
-    symbols = [
-        Literal("d").suppress(),
-        Literal("D").suppress(),
-    ]
-    @record(recorder, "{amount}d{shape} -> {result} **{sum}**")
-    def evaluate(self, tid: int = -1) -> Base:
-        result = super().evaluate(tid)
+    __slots__ = ()
+    symbols = ["d", "D"]
+    @record("{amount}d{shape} -> {result} **{sum}**")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         amount = Integer(1)
-        shape = self.operands[0].outcome["result"]
+        shape = context.result(self.operands[0])
         
         if isinstance(amount, Integer | IntegerList):
             amount = Integer(int(amount))
@@ -273,7 +582,7 @@ class SingleDice(Operator, RightUnaryAssociation):
             raise ShapeOverException()
 
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
+        context.outcome(self).update({
             "amount": amount,
             "shape": shape,
             "sum": Integer(int(result))
@@ -283,6 +592,16 @@ class SingleDice(Operator, RightUnaryAssociation):
 
     @property
     def function(self) -> Callable[..., Base]:
+        return self.rolling(as_source())
+
+    def bind(self, context: Context) -> Callable[..., Base]:
+        return self.rolling(context.random, context.budget)
+
+    def rolling(
+        self,
+        source: Source,
+        budget: Optional[Budget] = None
+    ) -> Callable[..., Base]:
         def f(
             shape: Union[Integer, Pair]
         ) -> IntegerList:
@@ -292,15 +611,19 @@ class SingleDice(Operator, RightUnaryAssociation):
             
             assert isinstance(min_value, Integer | IntegerList)
             assert isinstance(max_value, Integer | IntegerList) 
-            return IntegerList(
-                Integer(random.randint(int(min_value), int(max_value)))
-                for _ in range(1)
-            )
+            if budget is not None:
+                budget.roll(1)
+            if profiler.enabled:
+                profiler.count("evaluate", self.name, 1)
+            return IntegerList(source.rolls(
+                1, int(min_value), int(max_value)
+            ))
         return f 
 
 
 class Neg(Operator, RightUnaryAssociation):
-    symbols = [Literal("-").suppress()]
+    __slots__ = ()
+    symbols = ["-"]
     @property
     def function(self) -> Callable[..., Base]:
         def f(x: Intable) -> Intable:
@@ -316,7 +639,8 @@ class Neg(Operator, RightUnaryAssociation):
         return f
 
 class Add(Operator, LeftBinaryAssociation):
-    symbols = [Literal("+").suppress()]
+    __slots__ = ()
+    symbols = ["+"]
     @property
     def function(self) -> Callable[..., Base]:
         def f(
@@ -329,7 +653,8 @@ class Add(Operator, LeftBinaryAssociation):
         return f 
 
 class Sub(Operator, LeftBinaryAssociation):
-    symbols = [Literal("-").suppress()]
+    __slots__ = ()
+    symbols = ["-"]
     @property
     def function(self) -> Callable[..., Base]:
         def f(
@@ -342,7 +667,8 @@ class Sub(Operator, LeftBinaryAssociation):
         return f 
 
 class Mul(Operator, LeftBinaryAssociation):
-    symbols = [Literal("*").suppress()]
+    __slots__ = ()
+    symbols = ["*"]
     @property
     def function(self) -> Callable[..., Base]:
         def f(
@@ -355,7 +681,8 @@ class Mul(Operator, LeftBinaryAssociation):
         return f 
 
 class Div(Operator, LeftBinaryAssociation):
-    symbols = [Literal("/").suppress()]
+    __slots__ = ()
+    symbols = ["/"]
     @property
     def function(self) -> Callable[..., Base]:
         def f(
@@ -371,16 +698,17 @@ class Div(Operator, LeftBinaryAssociation):
         return f 
 
 class GE(Operator, LeftBinaryAssociation):
-    symbols = [Literal(">=").suppress()]
+    __slots__ = ()
+    symbols = [">="]
 
-    @record(recorder, "{x} >= {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} >= {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
 
@@ -398,16 +726,17 @@ class GE(Operator, LeftBinaryAssociation):
         return f
 
 class LE(Operator, LeftBinaryAssociation):
-    symbols = [Literal("<=").suppress()]
+    __slots__ = ()
+    symbols = ["<="]
 
-    @record(recorder, "{x} <= {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} <= {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
 
@@ -425,16 +754,17 @@ class LE(Operator, LeftBinaryAssociation):
         return f
 
 class GT(Operator, LeftBinaryAssociation):
-    symbols = [Literal(">").suppress()]
+    __slots__ = ()
+    symbols = [">"]
 
-    @record(recorder, "{x} > {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} > {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
 
@@ -452,16 +782,17 @@ class GT(Operator, LeftBinaryAssociation):
         return f
 
 class LT(Operator, LeftBinaryAssociation):
-    symbols = [Literal("<").suppress()]
+    __slots__ = ()
+    symbols = ["<"]
 
-    @record(recorder, "{x} < {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} < {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
 
@@ -479,16 +810,17 @@ class LT(Operator, LeftBinaryAssociation):
         return f
 
 class EQ(Operator, LeftBinaryAssociation):
-    symbols = [Literal("==").suppress()]
+    __slots__ = ()
+    symbols = ["=="]
 
-    @record(recorder, "{x} == {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} == {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
 
@@ -506,16 +838,17 @@ class EQ(Operator, LeftBinaryAssociation):
         return f
 
 class NE(Operator, LeftBinaryAssociation):
-    symbols = [Literal("!=").suppress()]
+    __slots__ = ()
+    symbols = ["!="]
 
-    @record(recorder, "{x} != {y} -> {result} {r}")
-    def evaluate(self, tid: int = -1):
-        result = super().evaluate(tid)
+    @record("{x} != {y} -> {result} {r}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
         
         assert isinstance(result, Integer | IntegerList)
-        self.outcome.update({
-            "x": self.operands[0].outcome["result"],
-            "y": self.operands[1].outcome["result"],
+        context.outcome(self).update({
+            "x": context.result(self.operands[0]),
+            "y": context.result(self.operands[1]),
             "r": Integer(int(result))
         })
         return result
@@ -531,36 +864,99 @@ class NE(Operator, LeftBinaryAssociation):
             return IntegerList([Integer(operator.ne(e, int(y))) for e in x])
         return f
 
+def keep(
+    values: List[Integer],
+    amount: int,
+    highest: bool
+) -> List[bool]:
+    """
+    Mark the dice kept by KeepMax (highest) or KeepMin.
+    Same dice as removing min (max) one at a time until amount are left:
+    among equal dice the earliest ones are dropped first.
+    Only the smaller of the kept and dropped sides is selected by a heap,
+    O(n log min(k, n-k)), then every die is marked in one pass.
+    return:
+        List[bool]: True for kept dice, in the order of values
+    ex) keep([3, 1, 3], 1, True) -> [False, False, True]
+    """
+    if amount < 0:
+        raise ValueError("keep amount must not be negative")
+
+    size = len(values)
+    drop = size - amount
+    if drop <= 0:
+        return [True] * size
+    if amount == 0:
+        return [False] * size
+
+    # order the dice worst first, the threshold is the last dropped value
+    if highest:
+        worse, worst, best = operator.lt, heapq.nsmallest, heapq.nlargest
+    else:
+        worse, worst, best = operator.gt, heapq.nlargest, heapq.nsmallest
+
+    if drop <= amount:
+        dropped = worst(drop, values)
+        threshold = dropped[-1]
+        ties = dropped.count(threshold)
+    else:
+        kept = best(amount, values)
+        threshold = kept[-1]
+        ties = values.count(threshold) - kept.count(threshold)
+
+    marks = []
+    for x in values:
+        if worse(x, threshold):
+            marks.append(False)
+        elif x == threshold and ties:
+            ties -= 1
+            marks.append(False)
+        else:
+            marks.append(True)
+    return marks
+
+def strike(operand: List[Integer], result: List[Integer]) -> String:
+    """
+    Annotate a keep: dice of operand not in result are struck through.
+    return:
+        String
+    ex) strike([3, 1, 3], [3]) -> "[~~1~~, ~~3~~, 3]"
+    """
+    quota = Counter(result)
+    removed = []
+    for x in operand:
+        if quota[x]:
+            quota[x] -= 1
+        else:
+            removed.append("~~" + str(x) + "~~")
+
+    return String("[" + ", ".join(removed + [str(x) for x in result]) + "]")
+
+class Struck(NamedTuple):
+    """Keep annotation, struck through only when the transcript is read"""
+    operand: List[Integer]
+    result: List[Integer]
+
+    def __str__(self) -> str:
+        return strike(self.operand, self.result)
+
 class KeepMax(Operator, LeftBinaryAssociation):
-    symbols = [
-        Literal("K").suppress(),
-        Literal("k").suppress(),
-    ]
+    __slots__ = ()
+    symbols = ["K", "k"]
 
-    @record(recorder, "{l}k{amount} -> {result}")
-    def evaluate(self, tid: int = -1) -> Base:
-        result = super().evaluate(tid)
-        operand = self.operands[0].outcome["result"]
+    @record("{l}k{amount} -> {result}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
+        operand = context.result(self.operands[0])
 
         assert isinstance(result, IntegerList)
         assert isinstance(operand, IntegerList)
-        operan = [x for x in operand] 
-
-        for x in result:
-            if x in operan:  
-                operan.remove(x) 
-
-        removed = ", ".join(map(
-            lambda x: "~~" + str(x) + "~~", operand
-        ))
-        accepted = ", ".join(map(
-            str, result
-        ))
-        l = String(f"[{removed}, {accepted}]")
-        self.outcome.update(
-            {"l": l, "amount": self.operands[1].outcome["result"]}
-        )
 
+        if context.recorder is not None:
+            context.outcome(self).update({
+                "l": Struck(operand, result),
+                "amount": context.result(self.operands[1])
+            })
 
         return result
 
@@ -570,40 +966,30 @@ class KeepMax(Operator, LeftBinaryAssociation):
             l: IntegerList, 
             amount: Intable
         ) -> IntegerList:
-            result = IntegerList(x for x in l) 
-            while len(result) > int(amount):
-                result.remove(min(result))
-            return result
+            values = l.data if isinstance(l, IntegerList) else list(l)
+            marks = keep(values, int(amount), True)
+            return IntegerList(
+                [x for x, kept in zip(values, marks) if kept]
+            )
         return f
 
 class KeepMin(Operator, LeftBinaryAssociation):
-    symbols = [
-        Literal("L").suppress(),
-        Literal("l").suppress(),
-    ]
+    __slots__ = ()
+    symbols = ["L", "l"]
     
-    @record(recorder, "{l}l{amount} -> {result}")
-    def evaluate(self, tid: int = -1) -> Base:
-        result = super().evaluate(tid)
+    @record("{l}l{amount} -> {result}")
+    def _steps(self, context: Context) -> Steps:
+        result = yield from super()._steps(context)
+        operand = context.result(self.operands[0])
 
-        operand = self.operands[0].outcome["result"]
         assert isinstance(result, IntegerList)
         assert isinstance(operand, IntegerList)
-        operan = [x for x in operand] 
-        for x in result:
-            if x in operan:
-                operan.remove(x) 
-
-        removed = ", ".join(map(
-            lambda x: "~~" + str(x) + "~~", operan
-        ))
-        accepted = ", ".join(map(
-            str, result
-        ))
-        l = String(f"[{removed}, {accepted}]")
-        self.outcome.update(
-            {"l": l, "amount": self.operands[1].outcome["result"]}
-        )
+
+        if context.recorder is not None:
+            context.outcome(self).update({
+                "l": Struck(operand, result),
+                "amount": context.result(self.operands[1])
+            })
 
         return result
 
@@ -613,9 +999,9 @@ class KeepMin(Operator, LeftBinaryAssociation):
             l: IntegerList, 
             amount: Intable
         ) -> IntegerList:
-            result = IntegerList(x for x in l)
-            while len(result) > int(amount):
-                result.remove(max(result)) 
-            return result
-        return f 
-
+            values = l.data if isinstance(l, IntegerList) else list(l)
+            marks = keep(values, int(amount), False)
+            return IntegerList(
+                [x for x, kept in zip(values, marks) if kept]
+            )
+        return f
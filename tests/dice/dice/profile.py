@@ -0,0 +1,169 @@
+import bisect
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+__all__ = ["Profiler", "profiler", "profiling"]
+
+# upper bounds of the latency histogram buckets in seconds
+BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+Key = Tuple[str, str]
+
+class Stat:
+    """Calls, dice and latencies of one (kind, name)"""
+    def __init__(self):
+        self.calls = 0
+        self.dice = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "dice": self.dice,
+            "seconds": self.seconds,
+            "buckets": dict(zip(BUCKETS + (float("inf"),), self.buckets)),
+        }
+
+class Profiler:
+    """
+    Opt-in counters of evaluation, recording, formatting and parsing.
+
+    Instrumented code checks enabled once and does nothing else while
+    it is off. Stats are kept per (kind, name): kind is one of
+    "evaluate", "record", "format", "parse" or "compiled" (dice rolled
+    by compiled closures) and name a node type or parser backend.
+    Latencies are inclusive, an evaluate of Repeat includes its body;
+    record excludes the node it records.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stats: Dict[Key, Stat] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def stat(self, kind: str, name: str) -> Stat:
+        stat = self.stats.get((kind, name))
+        if stat is None:
+            stat = self.stats.setdefault((kind, name), Stat())
+        return stat
+
+    def observe(self, kind: str, name: str, seconds: float):
+        with self.lock:
+            stat = self.stat(kind, name)
+            stat.calls += 1
+            stat.seconds += seconds
+            stat.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def count(self, kind: str, name: str, dice: int):
+        with self.lock:
+            self.stat(kind, name).dice += max(dice, 0)
+
+    def measure(
+        self,
+        kind: str,
+        name: str,
+        function: Callable[..., Any],
+        *args: Any
+    ) -> Any:
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.observe(kind, name, perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        return:
+            Dict[str, Dict[str, Dict]]: kind -> name -> stat
+        ex) profiler.snapshot()["evaluate"]["Dice"]["calls"] -> 3
+        """
+        with self.lock:
+            result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+            for (kind, name), stat in sorted(self.stats.items()):
+                result.setdefault(kind, {})[name] = stat.snapshot()
+            return result
+
+    def prometheus(self) -> str:
+        """
+        Stats in the Prometheus text exposition format
+        return:
+            str
+        ex) dice_calls_total{kind="evaluate",name="Dice"} 3
+        """
+        with self.lock:
+            items = sorted(self.stats.items())
+            lines: List[str] = [
+                "# HELP dice_calls_total Calls per kind and name",
+                "# TYPE dice_calls_total counter",
+            ]
+            lines += [
+                f"dice_calls_total{{{labels(key)}}} {stat.calls}"
+                for key, stat in items if stat.calls
+            ]
+            lines += [
+                "# HELP dice_rolled_total Dice rolled per node type",
+                "# TYPE dice_rolled_total counter",
+            ]
+            lines += [
+                f"dice_rolled_total{{{labels(key)}}} {stat.dice}"
+                for key, stat in items if stat.dice
+            ]
+            lines += [
+                "# HELP dice_seconds Latency per kind and name",
+                "# TYPE dice_seconds histogram",
+            ]
+            for key, stat in items:
+                if not stat.calls:
+                    continue
+                total = 0
+                for bound, count in zip(
+                    BUCKETS + (float("inf"),), stat.buckets
+                ):
+                    total += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"dice_seconds_bucket{{{labels(key)},le=\"{le}\"}} "
+                        f"{total}"
+                    )
+                lines.append(
+                    f"dice_seconds_sum{{{labels(key)}}} {stat.seconds!r}"
+                )
+                lines.append(
+                    f"dice_seconds_count{{{labels(key)}}} {stat.calls}"
+                )
+            return "\n".join(lines) + "\n"
+
+def labels(key: Key) -> str:
+    kind, name = key
+    return f'kind="{kind}",name="{name}"'
+
+profiler = Profiler()
+
+@contextmanager
+def profiling(reset: bool = True) -> Iterator[Profiler]:
+    """
+    Enable the profiler within the block
+    return:
+        Profiler
+    ex) with profiling() as p: parse("3d6").evaluate()
+    """
+    if reset:
+        profiler.reset()
+    enabled = profiler.enabled
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.enabled = enabled
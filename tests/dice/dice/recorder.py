@@ -1,21 +1,262 @@
-class Recorder(list):
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+from typing import (
+    Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple,
+    Union,
+)
+
+from dice.dice.profile import profiler
+
+__all__ = [
+    "Event", "Recorder", "recording", "tracing", "active_recorder", "record",
+]
+
+class Event(NamedTuple):
+    """
+    One recorded node: its class name, its formatter and a snapshot of
+    its outcome, formatted only when the transcript is read
+    """
+    name: str
+    formatter: str
+    outcome: Dict[str, Any]
+    end: str = ""
+
+    def __str__(self) -> str:
+        if profiler.enabled:
+            return profiler.measure("format", self.name, self.text)
+        return self.text()
+
+    def text(self) -> str:
+        return self.formatter.format(**self.outcome) + self.end
+
+# rolled outcome fields of an iteration, folded into the range they
+# took within a group like the results are
+ROLLED = ("amount", "shape", "y", "count")
+
+def signature(event: Event) -> tuple:
+    """
+    Static structure of the node that recorded event: every iteration of
+    a Repeat body records the same nodes, only a nested Repeat adds the
+    structure of its own groups
+    return:
+        tuple
+    """
+    return (event.name, event.formatter, event.outcome.get("key"))
+
+class Example(NamedTuple):
+    """Lines of one iteration, shown for its whole group"""
+    events: List[Event]
+
+    def __str__(self) -> str:
+        return " ".join(str(event).rstrip("\n") for event in self.events)
+
+class Group:
+    """
+    Iterations of a Repeat body with the same signature.
+    ranges holds the lowest and highest value of every rolled field,
+    by position of the event within the iteration
+    """
+    def __init__(self, key: tuple, example: List[Event]):
+        self.key = key
+        self.example = Example(example)
+        self.count = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.total = 0
+        self.ranges: Dict[Tuple[int, str], List[int]] = {}
+
+    def add(self, value: int, events: List[Event]):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        for index, event in enumerate(events):
+            outcome = event.outcome
+            for field in ROLLED:
+                if field not in outcome:
+                    continue
+                try:
+                    # pools count by their sum, as the nodes use them
+                    x = int(outcome[field])
+                except (TypeError, ValueError):
+                    # a Pair shape is shown by the example only
+                    continue
+                bounds = self.ranges.get((index, field))
+                if bounds is None:
+                    self.ranges[(index, field)] = [x, x]
+                elif x < bounds[0]:
+                    bounds[0] = x
+                elif x > bounds[1]:
+                    bounds[1] = x
+
+    def varying(self) -> str:
+        """
+        return:
+            str: rolled fields that took more than one value
+        ex) "; Dice amount 1-6"
+        """
+        events = self.example.events
+        names = [event.name for event in events]
+        text = [
+            # the position tells apart nodes of the same type
+            f"{names[index]}"
+            + (f"#{index + 1}" if names.count(names[index]) > 1 else "")
+            + f" {field} {low}-{high}"
+            for (index, field), (low, high) in self.ranges.items()
+            if low != high
+        ]
+        return "; " + ", ".join(text) if text else ""
+
+    def event(self) -> Event:
+        example = "{example} " if self.example.events else ""
+        return Event(
+            "Group",
+            "{count}x " + example
+            + "(min {min}, max {max}, total {total}{varying})",
+            {
+                "count": self.count, "example": self.example,
+                "min": self.min, "max": self.max, "total": self.total,
+                "varying": self.varying(), "key": self.key,
+            }
+        )
+
+class Frame:
+    """Summary of the Repeat being evaluated"""
     def __init__(self):
-      self.clear() 
+        self.head: List[Event] = []
+        self.buffer: List[Event] = []
+        self.groups: Dict[tuple, Group] = {}
+        self.final: Optional[Event] = None
+
+class Recorder(Sequence[str]):
+    """
+    Transcript of evaluations, a sequence of lines.
+    Nodes are stored as Events and turned into text on first read.
+
+    With detail=False every Repeat is summarized instead: iterations
+    with the same structure are grouped into one line giving the first
+    of them, their count, min, max and total and the range of every
+    rolled amount, shape and threshold, so the transcript no longer
+    grows with the repeat count.
+    """
+    def __init__(self, detail: bool = True):
+        self.detail = detail
+        self.events: List[Union[Event, str]] = []
+        self.clear() 
 
     def clear(self):
-        super().clear()
+        self.events.clear()
         self.indent = 0
         self.repeat = 0
         self.rcount = []
         self.open_close = 0
+        self.frames: List[Frame] = []
+
+    def append(self, line: Union[Event, str]):
+        if self.frames and isinstance(line, Event) and line.name == "Repeat":
+            # the Repeat of the innermost frame closing
+            self.frames[-1].final = line
+            return
+        self.push(line)
+
+    def push(self, line: Union[Event, str]):
+        if not self.frames:
+            self.write(line)
+        elif isinstance(line, Event):
+            self.frames[-1].buffer.append(line)
+
+    def write(self, line: Union[Event, str]):
+        self.events.append(line)
+
+    def begin(self):
+        """
+        Amount of the innermost Repeat is evaluated,
+        what it recorded stays in front of the iterations
+        """
+        if self.frames:
+            frame = self.frames[-1]
+            frame.head, frame.buffer = frame.buffer, []
+
+    def step(self, value: int):
+        """
+        One iteration of the innermost Repeat ended with value
+        """
+        if not self.frames:
+            return
+        frame = self.frames[-1]
+        key = tuple(signature(event) for event in frame.buffer)
+        group = frame.groups.get(key)
+        if group is None:
+            group = frame.groups[key] = Group(key, frame.buffer)
+        group.add(value, frame.buffer)
+        frame.buffer = []
+
+    def summarize(self, frame: Frame):
+        for event in frame.head:
+            self.push(event)
+        for group in frame.groups.values():
+            self.push(group.event())
+
+        final = frame.final
+        if final is None or not frame.groups:
+            if final is not None:
+                self.push(final)
+            return
+
+        groups = frame.groups.values()
+        self.push(Event(
+            "Repeat",
+            "repeat result -> {count} rolls, min {min}, max {max} **{sum}**",
+            {
+                "count": sum(g.count for g in groups),
+                "min": min(g.min for g in groups),
+                "max": max(g.max for g in groups),
+                "sum": final.outcome["sum"],
+                "result": final.outcome["result"],
+            },
+            final.end
+        ))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        line = self.events[index]
+        if isinstance(line, Event):
+            line = self.events[index] = str(line)
+        return line
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self.events)):
+            yield self[i]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (Recorder, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"Recorder({list(self)!r})"
 
     def in_repeat(self):
         self.repeat += 1
         self.rcount.append(1)
+        if not self.detail:
+            self.frames.append(Frame())
     
     def out_repeat(self):
         self.repeat -= 1
         self.rcount.pop()
+        if not self.detail:
+            self.summarize(self.frames.pop())
         
         # At the end of "repeat",
         # previous "repeat" should be increased
@@ -26,47 +267,107 @@ class Recorder(list):
     def is_first_step_in_repeat(self):
         return self.repeat > 0 and self.open_close == 0 
 
-thread_recorder = {}
-recorder = Recorder()
+# Recorder of the evaluations running in the current thread / task,
+# every thread and asyncio task sees its own value
+current: ContextVar[Optional[Recorder]] = ContextVar(
+    "recorder", default=None
+)
 
-def record(rec: Recorder, formatter: str):
-    def decorator(func):
-        def wrapper(*args, **kwargs):
-            x = kwargs.get("tid", -1)
+@contextmanager
+def recording(recorder: Optional[Recorder] = None) -> Iterator[Recorder]:
+    """
+    Evaluations within the block write their transcript to recorder,
+    the previous recorder is restored when the block ends
+    return:
+        Recorder
+    ex) with recording() as transcript: parse("1d6").evaluate()
+    """
+    if recorder is None:
+        recorder = Recorder()
+    token = current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        current.reset(token)
+
+def tracing() -> bool:
+    """
+    Whether a recording block is active in this thread / task
+    return:
+        bool
+    """
+    return current.get() is not None
 
-            if isinstance(args[-1], int):
-                x = args[-1]
+def active_recorder() -> Recorder:
+    """
+    Recorder set by the innermost recording block,
+    or a new one only living as long as the evaluation using it
+    return:
+        Recorder
+    """
+    recorder = current.get()
+    if recorder is None:
+        return Recorder()
+    return recorder
 
-            reca = rec
-            if x != -1:
-                reca = thread_recorder[x]
-            obj = args[0]
+def record(formatter: str):
+    """
+    Record the outcome of the decorated _steps as an Event.
+    The undecorated _steps stays reachable as __wrapped__, evaluations
+    without a recorder drive it directly (see Base._untraced_steps).
+    """
+    def decorator(func):
+        def opened(obj, reca):
             #repeat object behavior
             if obj.name == "Repeat":
                 reca.in_repeat()
-                result = func(*args, **kwargs) 
-                reca.append(formatter.format(**obj.outcome) + "\n")
-                reca.out_repeat()
-                return result
+                return
 
             #other object behavior
             if reca.is_first_step_in_repeat():
                 count = "-".join(map(str, reca.rcount))
                 reca.append(f"#{count}")
-                reca.rcount[rec.repeat-1] += 1
-            
+                reca.rcount[reca.repeat-1] += 1
+
             if reca.repeat > 0:
                 reca.open_close += 1
 
-            result = func(*args, **kwargs)
+        def closed(obj, context, reca):
+            name = obj.name
+            if name == "Repeat":
+                reca.append(Event(
+                    name, formatter, dict(context.outcome(obj)), "\n"
+                ))
+                reca.out_repeat()
+                return
 
-            if obj.name != "Repeat" and reca.repeat > 0:
+            if reca.repeat > 0:
                 reca.open_close -= 1
 
-            reca.append(formatter.format(**obj.outcome))
+            reca.append(Event(name, formatter, dict(context.outcome(obj))))
             if reca.repeat > 0 and reca.open_close == 0:
                 reca.append(" ")
 
+        @wraps(func)
+        def wrapper(obj, context):
+            reca = context.recorder
+            if reca is None:
+                return (yield from func(obj, context))
+            if profiler.enabled:
+                # time of the recording only, without the node itself
+                start = perf_counter()
+                opened(obj, reca)
+                spent = perf_counter() - start
+                result = yield from func(obj, context)
+                start = perf_counter()
+                closed(obj, context, reca)
+                spent += perf_counter() - start
+                profiler.observe("record", obj.name, spent)
+                return result
+
+            opened(obj, reca)
+            result = yield from func(obj, context)
+            closed(obj, context, reca)
             return result
         return wrapper
     return decorator
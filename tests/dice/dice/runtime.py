@@ -0,0 +1,42 @@
+"""
+Evaluation of trees serialized by dice.dice.serialize.dumps.
+
+Neither this module nor what it imports needs pyparsing or the grammar,
+so a worker can evaluate what a front process parsed once.
+ex) from dice.dice.runtime import evaluate
+    evaluate(data, Context(trace=False))
+"""
+from functools import lru_cache
+from typing import Optional
+
+from dice.dice.compiler import Compiled
+from dice.dice.context import Context
+from dice.dice.element import Base
+from dice.dice.serialize import loads
+
+__all__ = ["load", "load_compiled", "evaluate"]
+
+@lru_cache(maxsize=256)
+def load(data: bytes) -> Base:
+    """
+    Tree of data, shared by every caller loading the same bytes
+    return:
+        Base
+    """
+    return loads(data)
+
+@lru_cache(maxsize=256)
+def load_compiled(data: bytes) -> Compiled:
+    """
+    return:
+        Compiled: tree of data lowered for repeated untraced rolls
+    """
+    return load(data).compile()
+
+def evaluate(data: bytes, context: Optional[Context] = None) -> Base:
+    """
+    Evaluate the tree of data within context
+    return:
+        Base
+    """
+    return load(data).evaluate(context)
@@ -0,0 +1,128 @@
+import random
+import sys
+
+import pytest
+from pyparsing import ParserElement
+from dice.dice.context import Context
+from dice.dice.cost import bound
+from dice.dice.parser import parse
+from dice.error.custom import *
+
+np = pytest.importorskip("numpy")
+from dice.dice.batch import evaluate_many
+
+sys.setrecursionlimit(15000)
+
+BATCHCOUNT = 20000
+
+
+@pytest.mark.asyncio
+async def test_normal_batch_constant(normal_single_calc: str):
+    result = evaluate_many(parse(normal_single_calc), 10)
+    assert result.shape == (10,) and (result == 10).all()
+
+@pytest.mark.asyncio
+async def test_normal_batch_seeded(normal_complex_dice: str):
+    tree = parse(normal_complex_dice)
+    first = evaluate_many(tree, 100, rng=3)
+    second = evaluate_many(tree, 100, rng=np.random.default_rng(3))
+    assert (first == second).all()
+
+@pytest.mark.asyncio
+async def test_normal_batch_range(
+    expr: ParserElement,
+    normal_minmum_dice: str,
+    normal_max_kn_dice: str,
+    normal_min_kn_dice: str,
+    normal_gt_dice: str,
+):
+    cases = {
+        normal_minmum_dice: (10, 20),
+        normal_max_kn_dice: (2, 12),
+        normal_min_kn_dice: (2, 12),
+        normal_gt_dice: (1, 1),
+        "3d6 > 3": (0, 3),
+        "-1d4": (-4, -1),
+        "3n1d2": (3, 6),
+    }
+    for string, (low, high) in cases.items():
+        tree = expr.parse_string(string, parse_all=True)[0]
+        result = evaluate_many(tree, BATCHCOUNT, rng=0)
+        assert result.min() == low and result.max() == high, string
+
+@pytest.mark.asyncio
+async def test_normal_batch_keep_mean():
+    result = evaluate_many(parse("4d6k3"), BATCHCOUNT, rng=0)
+    assert abs(result.mean() - 12.2446) < 0.1
+
+    result = evaluate_many(parse("2d20l1"), BATCHCOUNT, rng=0)
+    assert abs(result.mean() - 7.175) < 0.15
+
+@pytest.mark.asyncio
+async def test_abnormal_batch_errors():
+    with pytest.raises(ZeroDivisionError):
+        evaluate_many(parse("1d6/(1d2-1)"), 100, rng=0)
+    with pytest.raises(AmountOverException):
+        evaluate_many(parse("10000d6"), 2)
+    with pytest.raises(RangeException):
+        evaluate_many(parse("1d(3, 2)"), 2)
+
+@pytest.mark.asyncio
+async def test_normal_batch_interpreter(
+    normal_single_number: str,
+    normal_single_calc: str,
+    normal_single_dice: str,
+    normal_braket_dice: str,
+    normal_combine_dice: str,
+    normal_minmum_dice: str,
+    normal_max_kn_dice: str,
+    normal_min_kn_dice: str,
+    normal_gt_dice: str,
+    normal_lt_dice: str,
+    normal_ge_dice: str,
+    normal_le_dice: str,
+    normal_eq_dice: str,
+    normal_ne_dice: str,
+    normal_complex_dice: str,
+):
+    count = 1000
+    for string in (
+        normal_single_number, normal_single_calc, normal_single_dice,
+        normal_braket_dice, normal_combine_dice, normal_minmum_dice,
+        normal_max_kn_dice, normal_min_kn_dice, normal_gt_dice,
+        normal_lt_dice, normal_ge_dice, normal_le_dice, normal_eq_dice,
+        normal_ne_dice, normal_complex_dice,
+    ):
+        tree = parse(string)
+        context = Context(rng=random.Random(0), trace=False)
+        expected = np.array([int(tree.evaluate(context)) for _ in range(count)])
+        result = evaluate_many(tree, BATCHCOUNT, rng=0)
+
+        low, high = bound(tree).total
+        assert low <= result.min() and result.max() <= high, string
+        # means agree within a few standard errors of both samples
+        error = np.sqrt(expected.var() / count + result.var() / BATCHCOUNT)
+        assert abs(result.mean() - expected.mean()) <= 5 * error + 1e-9, string
+
+@pytest.mark.asyncio
+async def test_normal_batch_dice_shape():
+    # a dice-valued face is rolled per die, never read as a pair
+    for string, (low, high) in {
+        "3d(1d6)": (1, 18),
+        "d(2d6)": (1, 12),
+        "3d(2n1d6)": (1, 36),
+    }.items():
+        result = evaluate_many(parse(string), BATCHCOUNT, rng=0)
+        assert low <= result.min() and result.max() <= high, string
+
+    result = evaluate_many(parse("2d(1d4)"), 200000, rng=0)
+    assert result.shape == (200000,) and result.max() <= 8
+
+@pytest.mark.asyncio
+async def test_abnormal_batch_overflow():
+    with pytest.raises(OverflowError):
+        evaluate_many(parse("9999999999*9999999999"), 2)
+    with pytest.raises(OverflowError):
+        evaluate_many(parse("4611686018427387904 + 4611686018427387904"), 2)
+    with pytest.raises(OverflowError):
+        evaluate_many(parse("99999999999d(9999999999, 99999999999)"), 2)
@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from dice.dice import Budget, Context, parse
+from dice.error.custom import *
+
+
+class Clock:
+    """Clock advancing one second per reading"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        self.now += 1
+        return self.now
+
+def evaluate(string: str, budget: Budget):
+    return parse(string).evaluate(Context(trace=False, rng=1, budget=budget))
+
+@pytest.mark.asyncio
+async def test_normal_budget_within():
+    budget = Budget(seconds=60, dice=12, nodes=20)
+    assert len(evaluate("3n4d6", budget)) == 3
+    assert budget.dice == 0
+
+@pytest.mark.asyncio
+async def test_normal_budget_compiled():
+    budget = Budget(dice=12)
+    parse("3n4d6").compile()(Context(trace=False, budget=budget))
+    assert budget.dice == 0
+
+    with pytest.raises(BudgetOverException):
+        parse("3n5d6").compile()(Context(trace=False, budget=Budget(dice=12)))
+
+@pytest.mark.asyncio
+async def test_normal_budget_cancel():
+    budget = Budget()
+    timer = threading.Timer(0.05, budget.cancel)
+    timer.start()
+
+    start = time.monotonic()
+    with pytest.raises(BudgetOverException):
+        evaluate("9999n9999d6", budget)
+    timer.join()
+    assert time.monotonic() - start < 5
+
+@pytest.mark.asyncio
+async def test_abnormal_budget_dice():
+    with pytest.raises(BudgetOverException, match="dice"):
+        evaluate("3n5d6", Budget(dice=12))
+    with pytest.raises(BudgetOverException, match="dice"):
+        evaluate("1d(1d6)+1d6", Budget(dice=2))
+
+@pytest.mark.asyncio
+async def test_abnormal_budget_nodes():
+    with pytest.raises(BudgetOverException, match="nodes"):
+        evaluate("1000n(1+1)", Budget(nodes=100))
+
+@pytest.mark.asyncio
+async def test_abnormal_budget_compiled_nodes():
+    compiled = parse("50n(1+1)").compile()
+    budget = Budget(nodes=10)
+    with pytest.raises(BudgetOverException, match="nodes"):
+        compiled(Context(trace=False, budget=budget))
+    assert budget.nodes < 0
+
+    # the same nodes as the interpreter are counted
+    budget, interpreted = Budget(nodes=1000), Budget(nodes=1000)
+    assert compiled(Context(trace=False, rng=1, budget=budget)) \
+        == evaluate("50n(1+1)", interpreted)
+    assert budget.nodes == interpreted.nodes
+
+@pytest.mark.asyncio
+async def test_abnormal_budget_time():
+    with pytest.raises(BudgetOverException, match="time"):
+        evaluate("9999n1d6", Budget(seconds=10, clock=Clock()))
+
+@pytest.mark.asyncio
+async def test_abnormal_budget_cancelled():
+    budget = Budget()
+    budget.cancel()
+    with pytest.raises(BudgetOverException, match="cancelled"):
+        evaluate("1", budget)
@@ -0,0 +1,60 @@
+import random
+import pytest
+from pyparsing import ParseException
+from dice.dice import ParseCache, expression
+from dice.dice.element import *
+
+
+@pytest.mark.asyncio
+async def test_normal_cache_hit(normal_max_kn_dice: str):
+    cache = ParseCache(maxsize=4)
+    first = cache.parse(normal_max_kn_dice)
+    second = cache.parse(normal_max_kn_dice)
+
+    assert first is second
+    assert isinstance(first, KeepMax)
+
+    info = cache.info()
+    assert info.hits == 1 and info.misses == 1 and info.currsize == 1
+
+@pytest.mark.asyncio
+async def test_normal_cache_eviction():
+    cache = ParseCache(maxsize=2)
+    one = cache.parse("1d6")
+    cache.parse("2d6")
+    cache.parse("1d6")
+    cache.parse("3d6")
+
+    assert cache.info().evictions == 1
+    assert cache.parse("1d6") is one
+    assert cache.info().misses == 3
+
+@pytest.mark.asyncio
+async def test_normal_cache_reevaluate(normal_complex_dice: str):
+    cache = ParseCache()
+    tree = cache.parse(normal_complex_dice)
+
+    for seed in range(10):
+        random.seed(seed)
+        fresh = expression.parse_string(
+            normal_complex_dice, parse_all=True
+        )[0].evaluate()
+
+        random.seed(seed)
+        assert tree.evaluate() == fresh
+
+@pytest.mark.asyncio
+async def test_abnormal_cache_parse_error():
+    cache = ParseCache()
+    with pytest.raises(ParseException):
+        cache.parse("3d")
+
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_normal_cache_backend(normal_complex_dice: str):
+    cache = ParseCache(backend="pratt")
+    tree = cache.parse(normal_complex_dice)
+    expected = expression.parse_string(normal_complex_dice, parse_all=True)[0]
+
+    assert repr(tree) == repr(expected)
@@ -0,0 +1,85 @@
+import io
+import json
+
+import pytest
+from dice.dice import ChromeTrace, Context, parse
+from dice.error.custom import *
+
+
+def spans(trace: ChromeTrace):
+    """(begin, end) event pairs in the order they were opened"""
+    stack, result = [], []
+    for event in trace.events:
+        if event["ph"] == "B":
+            stack.append(len(result))
+            result.append([event, None])
+        else:
+            index = stack.pop()
+            assert result[index][0]["name"] == event["name"]
+            result[index][1] = event
+    assert not stack
+    return result
+
+@pytest.mark.asyncio
+async def test_normal_chrome_trace_spans():
+    trace = ChromeTrace()
+    result = parse("2n(3d6k2)").evaluate(Context(rng=1, tracer=trace))
+
+    pairs = spans(trace)
+    names = [begin["name"] for begin, _ in pairs]
+    assert names[0] == "Repeat"
+    assert names.count("Repeat#1") == names.count("Repeat#2") == 1
+    assert names.count("Dice") == 2
+    assert names.count("KeepMax") == 2
+
+    begin, end = pairs[0]
+    assert begin["args"]["operands"] == ["Integer", "KeepMax"]
+    assert end["args"]["size"] == 2
+    assert end["args"]["result"] == str(result)
+    for begin, end in pairs:
+        assert begin["ts"] <= end["ts"]
+        assert begin["tid"] == end["tid"]
+
+    dice = next(end for begin, end in pairs if begin["name"] == "Dice")
+    assert dice["args"]["size"] == 3
+
+@pytest.mark.asyncio
+async def test_normal_chrome_trace_json():
+    trace = ChromeTrace()
+    parse("1d6+2").evaluate(Context(tracer=trace))
+    file = io.StringIO()
+    trace.dump(file)
+    data = json.loads(file.getvalue())
+    assert data["displayTimeUnit"] == "ms"
+    assert {event["ph"] for event in data["traceEvents"]} == {"B", "E"}
+    assert all(
+        {"name", "cat", "ph", "ts", "pid", "tid"} <= event.keys()
+        for event in data["traceEvents"]
+    )
+
+@pytest.mark.asyncio
+async def test_normal_chrome_trace_same_result():
+    tree = parse("4n(3d6k2+1d4)")
+    traced = tree.evaluate(Context(rng=7, trace=False, tracer=ChromeTrace()))
+    plain = tree.evaluate(Context(rng=7, trace=False))
+    assert traced == plain
+
+@pytest.mark.asyncio
+async def test_abnormal_chrome_trace_error():
+    trace = ChromeTrace()
+    with pytest.raises(Exception):
+        parse("1d0").evaluate(Context(tracer=trace))
+    _, end = spans(trace)[0]
+    assert "error" in end["args"]
+
+    for iterative in (False, True):
+        trace = ChromeTrace()
+        with pytest.raises(ZeroDivisionError):
+            parse("3n(1/0)").evaluate(
+                Context(tracer=trace, iterative=iterative)
+            )
+        failed = [
+            begin["name"] for begin, end in spans(trace)
+            if end["args"].get("error") == "ZeroDivisionError"
+        ]
+        assert failed == ["Repeat", "Repeat#1", "Div"]
@@ -0,0 +1,84 @@
+import random
+import pytest
+from pyparsing import ParseException, ParserElement
+from dice.dice.parser import parse
+from dice.dice.element import *
+from dice.error.custom import *
+from testdice.test_pratt import random_expression
+
+TESTCOUNT = 300
+
+
+def evaluate_both(tree, seed: int):
+    results = []
+    for function in (tree.evaluate, tree.compile()):
+        random.seed(seed)
+        try:
+            results.append(repr(function()))
+        except Exception as e:
+            results.append(type(e))
+    return results
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture", [
+    "normal_single_number", "normal_single_calc", "normal_single_dice",
+    "normal_braket_dice", "normal_combine_dice", "normal_minmum_dice",
+    "normal_max_kn_dice", "normal_min_kn_dice", "normal_gt_dice",
+    "normal_lt_dice", "normal_ge_dice", "normal_le_dice",
+    "normal_eq_dice", "normal_ne_dice", "normal_complex_dice",
+])
+async def test_normal_compile_fixtures(
+    expr: ParserElement,
+    fixture: str,
+    request
+):
+    tree = expr.parse_string(
+        request.getfixturevalue(fixture), parse_all=True
+    )[0]
+    for seed in range(5):
+        interpreted, compiled = evaluate_both(tree, seed)
+        assert compiled == interpreted
+
+@pytest.mark.asyncio
+async def test_normal_compile_generated():
+    rng = random.Random(7)
+    for seed in range(TESTCOUNT):
+        try:
+            tree = parse(random_expression(rng, 3), "pratt")
+        except ParseException:
+            continue
+        interpreted, compiled = evaluate_both(tree, seed)
+        assert compiled == interpreted, repr(tree)
+
+@pytest.mark.asyncio
+async def test_normal_compile_types():
+    assert isinstance(parse("4+2*3").compile()(), Integer)
+    assert isinstance(parse("3d6k2").compile()(), IntegerList)
+    assert isinstance(parse("(1, 2)").compile()(), Pair)
+
+@pytest.mark.asyncio
+async def test_normal_compile_transcript():
+    from dice.dice import ChromeTrace, Context
+    from dice.dice.recorder import Recorder
+
+    # 2d6d4 falls back to the interpreter, the transcript stays whole
+    tree = parse("1d6 + 2d6d4 + 3d6")
+    compiled, interpreted = Recorder(), Recorder()
+    assert tree.compile()(Context(compiled, rng=1)) \
+        == tree.evaluate(Context(interpreted, rng=1))
+    assert compiled == interpreted and len(compiled) == 3
+
+    trace = ChromeTrace()
+    tree.compile()(Context(trace=False, tracer=trace))
+    assert trace.events[0]["name"] == "Add"
+
+@pytest.mark.asyncio
+async def test_abnormal_compile_errors():
+    with pytest.raises(ZeroDivisionError):
+        parse("1d6/0").compile()()
+    with pytest.raises(AmountOverException):
+        parse("10000d6").compile()()
+    with pytest.raises(ShapeOverException):
+        parse("1d(1, 10000)").compile()()
+    with pytest.raises(RangeException):
+        parse("1d(3, 2)").compile()()
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pyparsing import ParserElement
+from dice.dice import Context, recording
+from dice.dice.recorder import Recorder, current
+from dice.dice.element import *
+
+
+@pytest.mark.asyncio
+async def test_normal_context_outcome(
+    expr: ParserElement,
+    normal_single_dice: str
+):
+    tree = expr.parse_string(normal_single_dice, parse_all=True)[0]
+    context = Context(Recorder())
+    result = tree.evaluate(context)
+
+    outcome = context.outcome(tree)
+    assert outcome["result"] is result
+    assert outcome["amount"] == 3 and outcome["shape"] == 6
+    assert outcome["sum"] == int(result)
+    assert not hasattr(tree, "outcome")
+
+@pytest.mark.asyncio
+async def test_normal_context_recorder(
+    expr: ParserElement,
+    normal_max_kn_dice: str
+):
+    tree = expr.parse_string(normal_max_kn_dice, parse_all=True)[0]
+    first, second = Recorder(), Recorder()
+
+    tree.evaluate(Context(first))
+    tree.evaluate(Context(second))
+
+    assert len(first) == len(second) == 2
+    assert first[0].startswith("3d6 -> ")
+
+@pytest.mark.asyncio
+async def test_normal_context_threads(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+
+    def roll(_):
+        recorder = Recorder()
+        context = Context(recorder)
+        result = tree.evaluate(context)
+        assert context.result(tree) is result
+        return recorder
+
+    with ThreadPoolExecutor(4) as pool:
+        for recorder in pool.map(roll, range(16)):
+            assert recorder[-1].startswith("repeat result -> ")
+
+@pytest.mark.asyncio
+async def test_normal_context_recording(
+    expr: ParserElement,
+    normal_max_kn_dice: str
+):
+    tree = expr.parse_string(normal_max_kn_dice, parse_all=True)[0]
+
+    with recording() as outer:
+        tree.evaluate()
+        with recording() as inner:
+            tree.evaluate()
+        tree.evaluate()
+
+    assert len(outer) == 4 and len(inner) == 2
+    assert current.get() is None
+
+    # outside of a recording block nothing is kept
+    tree.evaluate()
+    assert len(outer) == 4
+
+@pytest.mark.asyncio
+async def test_normal_context_trace_default(
+    expr: ParserElement,
+    normal_single_dice: str
+):
+    tree = expr.parse_string(normal_single_dice, parse_all=True)[0]
+
+    # nobody could read a transcript outside of a recording block
+    context = Context(rng=1)
+    tree.evaluate(context)
+    assert context.recorder is None
+
+    recorder = Recorder()
+    assert Context(recorder).recorder is recorder
+    with recording() as transcript:
+        context = Context(rng=1)
+        tree.evaluate(context)
+    assert context.recorder is transcript and len(transcript) == 1
+
+    assert isinstance(Context(trace=True).recorder, Recorder)
+    assert Context(recorder, trace=False).recorder is None
+
+@pytest.mark.asyncio
+async def test_normal_context_recording_tasks(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+
+    async def roll():
+        with recording() as transcript:
+            for operand in tree.operands:
+                operand.evaluate()
+                await asyncio.sleep(0)
+            tree.evaluate()
+        return transcript
+
+    transcripts = await asyncio.gather(*(roll() for _ in range(8)))
+    for transcript in transcripts:
+        assert transcript[-1].startswith("repeat result -> ")
+        assert transcript.repeat == 0 and transcript.rcount == []
+    assert current.get() is None
+
+@pytest.mark.asyncio
+async def test_abnormal_context_recording_released(
+    expr: ParserElement
+):
+    tree = expr.parse_string("1d0", parse_all=True)[0]
+    with pytest.raises(ValueError):
+        with recording():
+            tree.evaluate()
+    assert current.get() is None
@@ -0,0 +1,85 @@
+import random
+import pytest
+from pyparsing import ParseException
+from dice.dice import Context, parse
+from dice.dice.cost import *
+from dice.dice.element import Base
+from dice.dice.recorder import Recorder
+from dice.dice.source import RandomSource
+from dice.error.custom import *
+from testdice.test_pratt import random_expression
+
+TESTCOUNT = 300
+
+
+class Counting(RandomSource):
+    def __init__(self, seed: int):
+        super().__init__(random.Random(seed))
+        self.dice = 0
+
+    def rolls(self, amount: int, low: int, high: int):
+        self.dice += max(amount, 0)
+        return super().rolls(amount, low, high)
+
+def spend(tree, seed: int, monkeypatch) -> Cost:
+    nodes = 0
+    evaluate = Base.evaluate
+
+    def counted(self, context=None):
+        nonlocal nodes
+        nodes += 1
+        return evaluate(self, context)
+
+    source = Counting(seed)
+    recorder = Recorder()
+    with monkeypatch.context() as patch:
+        patch.setattr(Base, "evaluate", counted)
+        try:
+            tree.evaluate(Context(recorder, rng=source))
+        except Exception:
+            pass
+    return Cost(source.dice, nodes, len("\n".join(recorder).encode()))
+
+@pytest.mark.asyncio
+async def test_normal_cost_values():
+    assert estimate(parse("6")) == Cost(0, 1, 0)
+    assert estimate(parse("3d6")).dice == 3
+    assert estimate(parse("(1d6)d6")).dice == 7
+    assert estimate(parse("3n2d6")).dice == 6
+    assert estimate(parse("(2d6)n(1d6)")).dice == 2 + 12
+    assert estimate(parse("9999n9999d6")).dice == 9999 * 9999
+
+@pytest.mark.asyncio
+async def test_normal_cost_upper_bound(monkeypatch):
+    rng = random.Random(15)
+    checked = 0
+    while checked < TESTCOUNT:
+        string = random_expression(rng, 3)
+        try:
+            tree = parse(string, "pratt")
+            cost = estimate(tree)
+        except (ParseException, ValueError):
+            # n-ary Repeat fails before evaluating anything
+            continue
+        if cost.dice > 100_000:
+            continue
+
+        for seed in range(3):
+            actual = spend(tree, seed, monkeypatch)
+            assert all(a <= b for a, b in zip(actual, cost)), string
+        checked += 1
+
+@pytest.mark.asyncio
+async def test_normal_cost_admit():
+    assert admit(parse("4d6k3")) == estimate(parse("4d6k3"))
+    assert admit(parse("100n100d100")).dice == 10 ** 4
+    assert admit(parse("3d6"), Limits(dice=3)).dice == 3
+
+@pytest.mark.asyncio
+async def test_abnormal_cost_admit():
+    with pytest.raises(CostOverException):
+        admit(parse("9999n9999d6"))
+    with pytest.raises(CostOverException):
+        admit(parse("(1d6)n(1d6)"), Limits(nodes=10))
+    with pytest.raises(CostOverException):
+        admit(parse("1000d6"), Limits(transcript=1000))
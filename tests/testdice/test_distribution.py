@@ -0,0 +1,114 @@
+import pytest
+from fractions import Fraction
+from itertools import product
+from pyparsing import ParserElement
+from dice.dice.distribution import Distribution, distribution
+from dice.dice.parser import parse
+from dice.error.custom import *
+
+
+def brute_force(amount: int, sides: int, function=sum) -> Distribution:
+    rolls = list(product(range(1, sides + 1), repeat=amount))
+    pmf = {}
+    for roll in rolls:
+        value = function(roll)
+        pmf[value] = pmf.get(value, 0) + Fraction(1, len(rolls))
+    return Distribution(pmf)
+
+@pytest.mark.asyncio
+async def test_normal_distribution_dice(
+    expr: ParserElement,
+    normal_single_dice: str
+):
+    tree = expr.parse_string(normal_single_dice, parse_all=True)[0]
+    result = distribution(tree)
+
+    assert result == brute_force(3, 6)
+    assert result[10] == Fraction(27, 216)
+    assert result.mean == Fraction(21, 2)
+    assert result.variance == Fraction(35, 4)
+    assert result.cdf(2) == 0 and result.cdf(18) == 1
+    assert result.quantile(Fraction(1, 2)) == 10
+
+@pytest.mark.asyncio
+async def test_normal_distribution_arithmetic(
+    expr: ParserElement,
+    normal_minmum_dice: str
+):
+    tree = expr.parse_string(normal_minmum_dice + "+5", parse_all=True)[0]
+    result = distribution(tree)
+    assert result == Distribution({x: Fraction(1, 11) for x in range(15, 26)})
+
+    assert distribution(parse("2d6*3")) == brute_force(2, 6).map(lambda x: 3 * x)
+    assert distribution(parse("-1d4")) == -Distribution.uniform(1, 4)
+    assert distribution(parse("4+2*3")) == Distribution.constant(10)
+
+@pytest.mark.asyncio
+async def test_normal_distribution_comparison(normal_ge_dice: str):
+    assert distribution(parse("1d6 >= 4")) == Distribution({
+        0: Fraction(1, 2), 1: Fraction(1, 2)
+    })
+    assert distribution(parse("3d6 > 4")) == brute_force(
+        3, 6, lambda roll: sum(x > 4 for x in roll)
+    )
+    assert distribution(parse(normal_ge_dice)) == Distribution.constant(1)
+
+@pytest.mark.asyncio
+async def test_normal_distribution_nested():
+    result = distribution(parse("(1d3)d4"))
+    expected = {}
+    for amount in range(1, 4):
+        for value, p in brute_force(amount, 4):
+            expected[value] = expected.get(value, 0) + p / 3
+    assert result == Distribution(expected)
+
+    assert distribution(parse("2n1d6")).mean == 7
+    assert distribution(parse("3d6 - 2d6")).mean == Fraction(7, 2)
+
+@pytest.mark.asyncio
+async def test_abnormal_distribution_errors():
+    with pytest.raises(ZeroDivisionError):
+        distribution(parse("1d6/(1d2-1)"))
+    with pytest.raises(AmountOverException):
+        distribution(parse("(1d2*5000)d6"))
+    with pytest.raises(RangeException):
+        distribution(parse("1d(1d6, 3)"))
+
+def brute_force_keep(amount: int, low: int, high: int, keep: int, highest: bool):
+    def function(roll):
+        return sum(sorted(roll, reverse=highest)[:max(keep, 0)])
+    offset = low - 1
+    return brute_force(
+        amount, high - offset,
+        lambda roll: function([x + offset for x in roll])
+    )
+
+@pytest.mark.asyncio
+async def test_normal_distribution_keep(
+    normal_max_kn_dice: str,
+    normal_min_kn_dice: str
+):
+    assert distribution(parse(normal_max_kn_dice)) == brute_force_keep(3, 1, 6, 2, True)
+    assert distribution(parse(normal_min_kn_dice)) == brute_force_keep(3, 1, 6, 2, False)
+    assert distribution(parse("4d6k3")).mean == Fraction(15869, 1296)
+    assert distribution(parse("2d20k1")).mean == Fraction(553, 40)
+    assert distribution(parse("2d20l1")).mean == Fraction(287, 40)
+
+@pytest.mark.asyncio
+async def test_normal_distribution_keep_pair():
+    assert distribution(parse("4d(2, 5)l2")) == brute_force_keep(4, 2, 5, 2, False)
+    assert distribution(parse("5d(3, 4)k3")) == brute_force_keep(5, 3, 4, 3, True)
+    assert distribution(parse("3d6k0")) == Distribution.constant(0)
+    assert distribution(parse("3d6k5")) == brute_force(3, 6)
+    assert distribution(parse("4d6k3k2")) == brute_force_keep(4, 1, 6, 2, True)
+
+@pytest.mark.asyncio
+async def test_abnormal_distribution_keep():
+    with pytest.raises(NotImplementedError):
+        distribution(parse("4d6k3 > 3"))
+    with pytest.raises(NotImplementedError):
+        distribution(parse("(4d6k3)k2"))
+    with pytest.raises(NotImplementedError):
+        distribution(parse("(4d6k3)l2"))
+    with pytest.raises(TypeError):
+        distribution(parse("(1+2)k1"))
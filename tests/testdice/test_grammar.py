@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pyparsing import ParseException, ParserElement
+from dice.dice.parser import Lazy, Packrat, expression, packrat, parse
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def modules_after(code: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code + "\nimport sys\nprint(*sys.modules)"],
+        cwd=TESTS, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+@pytest.mark.asyncio
+async def test_normal_grammar_lazy_import():
+    modules = modules_after("from dice.dice import parse")
+    assert "dice.dice.parser" in modules
+    assert "pyparsing" not in modules and "dice.dice.pratt" not in modules
+
+    assert "pyparsing" in modules_after(
+        "from dice.dice import parse\nparse('1d6')"
+    )
+
+@pytest.mark.asyncio
+async def test_normal_grammar_built_once():
+    built = []
+    lazy = Lazy(lambda: built.append(1) or object())
+    assert lazy.built is None
+    assert lazy.get() is lazy.get() and built == [1]
+
+    parse("1d6")
+    assert expression.get() is expression.get()
+    assert expression.parse_string("3d6", parse_all=True)[0].name == "Dice"
+
+@pytest.mark.asyncio
+async def test_normal_packrat_counters(normal_complex_dice: str):
+    packrat.reset()
+    parse("4d6k3")
+    parse(normal_complex_dice)
+    info = packrat.info()
+    assert info.parses == 2 and info.hits > 0 and info.misses > 0
+    assert info.maxsize == 128
+    assert 0 < info.last <= info.peak <= 128
+
+    # nothing of the parse stays in the memo
+    assert ParserElement.packrat_cache_stats[:2] == [0, 0]
+
+@pytest.mark.asyncio
+async def test_normal_packrat_resize(normal_complex_dice: str):
+    expected = repr(parse(normal_complex_dice))
+    try:
+        for maxsize in (None, 16):
+            packrat.resize(maxsize)
+            packrat.reset()
+            assert repr(parse(normal_complex_dice)) == expected
+            info = packrat.info()
+            assert info.maxsize == maxsize
+            if maxsize is None:
+                assert info.peak == info.misses
+            else:
+                assert info.peak == maxsize
+    finally:
+        packrat.resize(128)
+
+@pytest.mark.asyncio
+async def test_normal_packrat_threads(normal_complex_dice: str):
+    strings = [normal_complex_dice, "4d6k3", "1d(2, 5)+3", "2n1d4"] * 8
+    expected = [repr(parse(string, "pratt")) for string in strings]
+    packrat.reset()
+    with ThreadPoolExecutor(4) as pool:
+        trees = list(pool.map(parse, strings))
+    assert [repr(tree) for tree in trees] == expected
+    assert packrat.info().parses == len(strings)
+
+@pytest.mark.asyncio
+async def test_normal_packrat_expression(normal_complex_dice: str):
+    from dice.dice.profile import profiling
+
+    packrat.reset()
+    with profiling() as p:
+        tree = expression.parse_string(normal_complex_dice, parse_all=True)[0]
+        expression.parseString("3d6")
+    assert repr(tree) == repr(parse(normal_complex_dice))
+
+    # the proxy holds the memo policy like parse() does
+    assert packrat.info().parses == 3
+    assert ParserElement.packrat_cache_stats[:2] == [0, 0]
+    assert p.snapshot()["parse"]["pyparsing"]["calls"] == 2
+
+    with pytest.raises(ParseException):
+        expression.parse_string("3d6 x", parse_all=True)
+    assert packrat.info().parses == 4
+    assert ParserElement.packrat_cache_stats[:2] == [0, 0]
+
+@pytest.mark.asyncio
+async def test_abnormal_packrat():
+    with pytest.raises(ValueError):
+        Packrat(0)
+    with pytest.raises(ValueError):
+        packrat.resize(-1)
+    packrat.reset()
+    with pytest.raises(ParseException):
+        parse("1d")
+    assert packrat.info().parses == 1
+    assert ParserElement.packrat_cache_stats[:2] == [0, 0]
@@ -0,0 +1,47 @@
+import sys
+import pytest
+from array import array
+from dice.dice import Context, parse
+from dice.dice.element import *
+
+
+@pytest.mark.asyncio
+async def test_normal_integer_list_protocol():
+    values = IntegerList([3, 1, 6])
+    assert int(values) == 10
+    assert len(values) == 3
+    assert all(isinstance(x, Integer) for x in values)
+    assert isinstance(values[0], Integer) and values[-1] == 6
+    assert values[1:] == [1, 6] and isinstance(values[1:], IntegerList)
+    assert values == [3, 1, 6] and [3, 1, 6] == values
+    assert values == IntegerList([3, 1, 6])
+    assert values != [3, 1] and values != (3, 1, 6)
+    assert repr(values) == str(values) == "[3, 1, 6]"
+    assert 6 in values and values.count(1) == 1
+
+    values.append(Integer(2))
+    values.remove(3)
+    assert values == [1, 6, 2]
+    assert IntegerList() == [] and not IntegerList()
+
+@pytest.mark.asyncio
+async def test_normal_integer_list_compact():
+    result = parse("9999d6").evaluate(Context(trace=False, rng=1))
+    assert isinstance(result.data, array)
+    assert sys.getsizeof(result.data) < 9999 * 9
+
+    nodes = [result, Integer(3), parse("1d6+2"), Pair(Integer(1), Integer(2))]
+    for node in nodes:
+        assert not hasattr(node, "__dict__")
+
+@pytest.mark.asyncio
+async def test_normal_integer_list_big():
+    big = 2 ** 70
+    values = IntegerList([1, big])
+    assert int(values) == big + 1
+    values = IntegerList([1])
+    values.append(Integer(big))
+    assert values == [1, big] and int(values) == big + 1
+
+    result = parse("2n(9999*9999*9999*9999*9999)").evaluate()
+    assert result == [9999 ** 5] * 2
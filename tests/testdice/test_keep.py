@@ -0,0 +1,66 @@
+import random
+import pytest
+from dice.dice import Context
+from dice.dice.parser import parse
+from dice.dice.element import *
+from dice.dice.element import MAXAMOUNT, keep, strike
+from dice.dice.recorder import Recorder
+
+TESTCOUNT = 2000
+
+
+def remove_loop(values, amount, highest):
+    result = list(values)
+    while len(result) > amount:
+        result.remove(min(result) if highest else max(result))
+    return result
+
+@pytest.mark.asyncio
+async def test_normal_keep_same_as_remove_loop():
+    rng = random.Random(9)
+    for _ in range(TESTCOUNT):
+        values = [rng.randint(1, 4) for _ in range(rng.randint(0, 12))]
+        amount = rng.randint(0, 14)
+        highest = rng.random() < 0.5
+
+        marks = keep(values, amount, highest)
+        kept = [x for x, mark in zip(values, marks) if mark]
+        assert kept == remove_loop(values, amount, highest)
+
+@pytest.mark.asyncio
+async def test_normal_keep_ties_drop_earliest():
+    assert keep([3, 1, 3], 1, True) == [False, False, True]
+    assert keep([1, 3, 1], 1, False) == [False, False, True]
+    assert keep([2, 2, 2, 2], 3, True) == [False, True, True, True]
+
+@pytest.mark.asyncio
+async def test_normal_keep_strike():
+    assert strike([3, 1, 3], [3]) == "[~~1~~, ~~3~~, 3]"
+    assert strike([5, 2], [5, 2]) == "[5, 2]"
+    assert strike([], []) == "[]"
+
+@pytest.mark.asyncio
+async def test_normal_keep_max_strikes_only_dropped():
+    tree = KeepMax(IntegerList(map(Integer, [4, 1, 6, 2])), Integer(2))
+    context = Context(Recorder())
+    result = tree.evaluate(context)
+
+    assert result == [4, 6]
+    assert context.recorder == ["[~~1~~, ~~2~~, 4, 6]k2 -> [4, 6]"]
+
+@pytest.mark.asyncio
+async def test_normal_keep_large_pool():
+    random.seed(3)
+    result = parse(f"{MAXAMOUNT - 1}d6k1").evaluate(Context(Recorder()))
+    assert result == [6]
+
+    pool = parse(f"{MAXAMOUNT - 1}d6").evaluate(Context(Recorder()))
+    tree = KeepMin(pool, Integer(MAXAMOUNT - 2))
+    assert tree.evaluate(Context(Recorder())) == remove_loop(
+        pool, MAXAMOUNT - 2, False
+    )
+
+@pytest.mark.asyncio
+async def test_abnormal_keep_negative_amount():
+    with pytest.raises(ValueError):
+        keep([1, 2, 3], -1, True)
@@ -0,0 +1,54 @@
+import random
+import pytest
+from pyparsing import ParseException
+from dice.dice import Context
+from dice.dice.element import *
+from dice.dice.optimize import fold_constants
+from dice.dice.parser import parse
+from dice.dice.recorder import Recorder
+from testdice.test_pratt import random_expression
+
+TESTCOUNT = 300
+
+
+def roll(tree, seed: int):
+    recorder = Recorder()
+    random.seed(seed)
+    try:
+        result = repr(tree.evaluate(Context(recorder)))
+    except Exception as e:
+        result = type(e)
+    return result, list(recorder)
+
+@pytest.mark.asyncio
+async def test_normal_fold_calc(normal_single_calc: str):
+    tree = parse(normal_single_calc, optimize=True)
+    assert isinstance(tree, Integer) and tree == 10
+
+@pytest.mark.asyncio
+async def test_normal_fold_dice_operand(normal_complex_dice: str):
+    tree = parse(normal_complex_dice)
+    folded = fold_constants(tree)
+
+    assert "Mul" in repr(tree) and "Mul" not in repr(folded)
+    assert roll(folded, 0) == roll(tree, 0)
+
+@pytest.mark.asyncio
+async def test_abnormal_fold_zero_division():
+    tree = parse("1d6+4/(1-1)", optimize=True)
+    assert isinstance(tree, Add)
+
+    recorder = Recorder()
+    with pytest.raises(ZeroDivisionError):
+        tree.evaluate(Context(recorder))
+    assert len(recorder) == 1
+
+@pytest.mark.asyncio
+async def test_normal_fold_generated():
+    rng = random.Random(11)
+    for seed in range(TESTCOUNT):
+        try:
+            tree = parse(random_expression(rng, 3), "pratt")
+        except ParseException:
+            continue
+        assert roll(fold_constants(tree), seed) == roll(tree, seed)
@@ -0,0 +1,105 @@
+import random
+
+import pytest
+from dice.dice import Context, Recorder, parse
+from dice.dice.element import *
+from dice.dice.element import LAZY, roll_pool
+from dice.dice.source import NumpySource, RandomSource, Source, as_source
+
+
+def expanded(pool: DicePool) -> bool:
+    try:
+        IntegerList.data.__get__(pool, IntegerList)
+    except AttributeError:
+        return False
+    return True
+
+@pytest.mark.asyncio
+async def test_normal_pool_sum_only():
+    untraced = lambda: Context(trace=False, rng=1)
+    result = parse(f"{LAZY * 4}d6").evaluate(untraced())
+    assert isinstance(result, DicePool)
+    total = int(parse(f"{LAZY * 4}d6*2").evaluate(untraced()))
+
+    assert len(result) == LAZY * 4
+    assert int(result) * 2 == total
+    assert not expanded(result)
+
+    assert all(1 <= x <= 6 for x in result)
+    assert expanded(result)
+    assert sum(result.data) == int(result)
+
+@pytest.mark.asyncio
+async def test_normal_pool_replay():
+    pool = roll_pool(as_source(3), 9000, 1, 20)
+    again = roll_pool(as_source(3), 9000, 1, 20)
+    assert isinstance(pool, DicePool)
+    assert pool.values() == list(again) and int(pool) == int(again)
+    assert isinstance(roll_pool(as_source(3), LAZY - 1, 1, 6), IntegerList)
+
+@pytest.mark.asyncio
+async def test_normal_pool_transcript():
+    recorder = Recorder()
+    tree = parse(f"{LAZY * 2}d6k3")
+    result = tree.evaluate(Context(recorder, rng=5))
+    assert result == tree.evaluate(Context(trace=False, rng=5))
+
+    context = Context(Recorder(), rng=5)
+    pool = parse(f"{LAZY * 2}d6").evaluate(context)
+    assert str(pool) in "\n".join(context.recorder)
+
+@pytest.mark.asyncio
+async def test_normal_pool_compiled():
+    for string in [f"{LAZY}d6k3", f"{LAZY * 3}d(2, 9)+1", f"2n{LAZY}d4"]:
+        tree = parse(string)
+        assert tree.compile()(Context(trace=False, rng=9)) \
+            == tree.evaluate(Context(trace=False, rng=9))
+
+@pytest.mark.asyncio
+async def test_abnormal_pool_range():
+    with pytest.raises(ValueError):
+        roll_pool(as_source(1), LAZY, 6, 1)
+
+@pytest.mark.asyncio
+async def test_normal_pool_custom_source():
+    class Highest(Source):
+        def randint(self, low: int, high: int) -> int:
+            return high
+
+    for amount in [LAZY - 1, LAZY, LAZY * 4]:
+        tree = parse(f"{amount}d6")
+        assert int(tree.evaluate(Context(trace=False, rng=Highest()))) \
+            == amount * 6
+        assert int(tree.compile()(Context(trace=False, rng=Highest()))) \
+            == amount * 6
+
+    class Seeded(RandomSource):
+        pass
+
+    # a subclass may roll its dice another way, it is never replayed
+    pool = roll_pool(Seeded(random.Random(1)), LAZY, 1, 6)
+    assert not isinstance(pool, DicePool) and len(pool) == LAZY
+
+@pytest.mark.asyncio
+async def test_normal_pool_numpy_source():
+    np = pytest.importorskip("numpy")
+    source = lambda: NumpySource(np.random.default_rng(4))
+    pool = roll_pool(source(), LAZY * 2, 1, 6)
+    assert isinstance(pool, DicePool)
+    assert pool.values() == list(roll_pool(source(), LAZY * 2, 1, 6))
+
+@pytest.mark.asyncio
+async def test_normal_pool_mutation():
+    pool = roll_pool(as_source(2), LAZY, 1, 6)
+    assert isinstance(pool, DicePool)
+    total = int(pool)
+
+    pool.append(100)
+    assert len(pool) == LAZY + 1 == len(pool.data)
+    assert int(pool) == total + 100 == sum(pool.data)
+    assert pool.values() == list(pool.data)
+
+    pool.extend([200, 300])
+    pool.remove(100)
+    assert len(pool) == LAZY + 2
+    assert int(pool) == total + 500 == sum(pool)
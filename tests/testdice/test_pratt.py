@@ -0,0 +1,80 @@
+import random
+import pytest
+from pyparsing import ParseException
+from dice.dice.parser import parse
+
+FUZZCOUNT = 300
+
+
+import sys
+sys.setrecursionlimit(15000)
+
+BINARY = ["d", "D", "n", "N", "k", "K", "l", "L",
+          "/", "*", "-", "+", ">=", ">", "<=", "<", "==", "!="]
+UNARY = ["d", "-"]
+TOKENS = BINARY + ["1", "23", "(", ")", ",", " ", "=", "!"]
+
+def random_expression(rng: random.Random, depth: int) -> str:
+    choice = rng.randrange(6) if depth > 0 else 0
+    if choice == 0:
+        return str(rng.randint(0, 30))
+    if choice == 1:
+        return rng.choice(UNARY) + random_expression(rng, depth - 1)
+    if choice == 2:
+        return "(" + random_expression(rng, depth - 1) + ")"
+    if choice == 3:
+        return "({}, {})".format(
+            random_expression(rng, depth - 1),
+            random_expression(rng, depth - 1),
+        )
+    operands = [
+        random_expression(rng, depth - 1)
+        for _ in range(rng.randint(2, 3))
+    ]
+    return rng.choice(["", " "]).join(
+        x + rng.choice(BINARY) for x in operands[:-1]
+    ) + operands[-1]
+
+def both(string: str):
+    results = []
+    for backend in ("pyparsing", "pratt"):
+        try:
+            results.append(repr(parse(string, backend)))
+        except ParseException:
+            results.append(ParseException)
+    return results
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fixture", [
+    "normal_single_number", "normal_single_calc", "normal_single_dice",
+    "normal_braket_dice", "normal_combine_dice", "normal_minmum_dice",
+    "normal_max_kn_dice", "normal_min_kn_dice", "normal_gt_dice",
+    "normal_lt_dice", "normal_ge_dice", "normal_le_dice",
+    "normal_eq_dice", "normal_ne_dice", "normal_complex_dice",
+])
+async def test_normal_pratt_fixtures(fixture: str, request):
+    pyparsing, pratt = both(request.getfixturevalue(fixture))
+    assert pratt == pyparsing
+
+@pytest.mark.asyncio
+async def test_normal_pratt_generated():
+    rng = random.Random(3)
+    for _ in range(FUZZCOUNT):
+        string = random_expression(rng, 3)
+        pyparsing, pratt = both(string)
+        assert pratt == pyparsing, string
+
+@pytest.mark.asyncio
+async def test_abnormal_pratt_tokens():
+    rng = random.Random(5)
+    for _ in range(FUZZCOUNT):
+        string = "".join(
+            rng.choice(TOKENS) for _ in range(rng.randint(1, 8))
+        )
+        pyparsing, pratt = both(string)
+        assert pratt == pyparsing, string
+
+@pytest.mark.asyncio
+async def test_abnormal_pratt_backend():
+    with pytest.raises(ValueError):
+        parse("1", backend="yacc")
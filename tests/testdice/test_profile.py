@@ -0,0 +1,60 @@
+import pytest
+from dice.dice import Context, parse, recording
+from dice.dice.profile import BUCKETS, Profiler, profiler, profiling
+from dice.dice.recorder import Recorder
+
+
+@pytest.mark.asyncio
+async def test_normal_profile_disabled():
+    profiler.reset()
+    parse("4d6k3").evaluate(Context(Recorder()))
+    assert not profiler.enabled
+    assert profiler.snapshot() == {}
+
+@pytest.mark.asyncio
+async def test_normal_profile_counters():
+    with profiling() as p:
+        with recording() as transcript:
+            parse("3n2d6k1", "pratt").evaluate()
+        "\n".join(transcript)
+    assert not profiler.enabled
+
+    stats = p.snapshot()
+    assert stats["parse"]["pratt"]["calls"] == 1
+    assert stats["evaluate"]["Dice"] == stats["evaluate"]["Dice"] | {
+        "calls": 3, "dice": 6
+    }
+    assert stats["evaluate"]["Repeat"]["calls"] == 1
+    assert stats["record"]["KeepMax"]["calls"] == 1
+    assert stats["format"]["Dice"]["calls"] == 3
+    assert sum(stats["evaluate"]["Dice"]["buckets"].values()) == 3
+
+    # Repeat includes the time of its body
+    assert stats["evaluate"]["Repeat"]["seconds"] >= \
+        stats["evaluate"]["Dice"]["seconds"]
+
+@pytest.mark.asyncio
+async def test_normal_profile_compiled():
+    with profiling() as p:
+        parse("4d6+d8").compile()()
+    stats = p.snapshot()["compiled"]
+    assert stats["Dice"]["dice"] == 4
+    assert stats["SingleDice"]["dice"] == 1
+
+@pytest.mark.asyncio
+async def test_normal_profile_prometheus():
+    p = Profiler()
+    p.observe("evaluate", "Dice", 5e-6)
+    p.observe("evaluate", "Dice", 5e-3)
+    p.count("evaluate", "Dice", 7)
+    text = p.prometheus()
+
+    assert 'dice_calls_total{kind="evaluate",name="Dice"} 2' in text
+    assert 'dice_rolled_total{kind="evaluate",name="Dice"} 7' in text
+    assert 'dice_seconds_bucket{kind="evaluate",name="Dice",le="1e-05"} 1' \
+        in text
+    assert 'dice_seconds_bucket{kind="evaluate",name="Dice",le="+Inf"} 2' \
+        in text
+    assert 'dice_seconds_count{kind="evaluate",name="Dice"} 2' in text
+    assert text.count("dice_seconds_bucket") == len(BUCKETS) + 1
+    assert "# TYPE dice_seconds histogram" in text
@@ -0,0 +1,167 @@
+import sys
+import pytest
+from pyparsing import ParserElement
+from dice.dice import Context, recording
+from dice.dice.element import *
+from dice.dice.recorder import Event, Recorder
+
+sys.setrecursionlimit(15000)
+
+
+class Counted:
+    """Formats as its value, counting how often it was formatted"""
+    def __init__(self, value):
+        self.value = value
+        self.count = 0
+
+    def __format__(self, spec: str) -> str:
+        self.count += 1
+        return format(self.value, spec)
+
+@pytest.mark.asyncio
+async def test_normal_recorder_untraced(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+    context = Context(trace=False)
+    result = tree.evaluate(context)
+
+    assert context.recorder is None
+    assert context.result(tree) is result
+
+@pytest.mark.asyncio
+async def test_normal_recorder_untraced_undecorated(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+    for cls in (Repeat, Dice, KeepMin, GT):
+        assert cls._untraced_steps is cls._steps.__wrapped__
+    assert Add._untraced_steps is Add._steps
+
+    steps = Dice(Integer(3), Integer(6))._untraced_steps(Context(trace=False))
+    assert steps.gi_code.co_qualname == "Dice._steps"
+
+    for iterative in (False, True):
+        assert tree.evaluate(Context(trace=False, rng=3, iterative=iterative)) \
+            == tree.evaluate(Context(Recorder(), rng=3))
+
+@pytest.mark.asyncio
+async def test_normal_recorder_untraced_outside_recording(
+    expr: ParserElement,
+    normal_max_kn_dice: str
+):
+    tree = expr.parse_string(normal_max_kn_dice, parse_all=True)[0]
+    with recording() as transcript:
+        Context(trace=False)
+        tree.evaluate(Context(trace=False))
+    assert len(transcript) == 0
+
+@pytest.mark.asyncio
+async def test_normal_recorder_lazy_event():
+    value = Counted(3)
+    recorder = Recorder()
+    recorder.append(Event("Dice", "{result} -> {result}", {"result": value}))
+    recorder.append(" ")
+    assert value.count == 0
+
+    assert recorder[0] == "3 -> 3"
+    assert list(recorder) == ["3 -> 3", " "]
+    assert value.count == 2
+
+@pytest.mark.asyncio
+async def test_normal_recorder_events(
+    expr: ParserElement,
+    normal_combine_dice: str
+):
+    tree = expr.parse_string(normal_combine_dice, parse_all=True)[0]
+    recorder = Recorder()
+    result = tree.evaluate(Context(recorder))
+
+    events = [e for e in recorder.events if isinstance(e, Event)]
+    assert [e.name for e in events] == ["Dice"] * 3 + ["Repeat"]
+    assert [int(e.outcome["result"]) for e in events[:3]] == result
+    assert events[-1].outcome["result"] is result
+
+    text = list(recorder)
+    assert text[0] == "#1" and text[-1].startswith("repeat result -> ")
+    assert recorder == text and recorder[1:3] == text[1:3]
+
+@pytest.mark.asyncio
+async def test_normal_recorder_keep_annotation(
+    expr: ParserElement,
+    normal_min_kn_dice: str
+):
+    tree = expr.parse_string(normal_min_kn_dice, parse_all=True)[0]
+    recorder = Recorder()
+    result = tree.evaluate(Context(recorder))
+
+    assert recorder[-1].endswith(f"l2 -> {result}")
+    assert recorder[-1].count("~~") == 2
+
+@pytest.mark.asyncio
+async def test_normal_recorder_summary_constant():
+    lines = []
+    for amount in (10, 9999):
+        recorder = Recorder(detail=False)
+        tree = Repeat(Integer(amount), Dice(Integer(1), Integer(6)))
+        result = tree.evaluate(Context(recorder, rng=1))
+        lines.append(list(recorder))
+
+        assert recorder[0].startswith(f"{amount}x 1d6 -> ")
+        assert recorder[0].endswith(
+            f"(min {min(result)}, max {max(result)}, total {int(result)})"
+        )
+    assert len(lines[0]) == len(lines[1]) == 2
+
+@pytest.mark.asyncio
+async def test_normal_recorder_summary_groups(
+    expr: ParserElement
+):
+    tree = expr.parse_string("(1d6)n((1d3)d6)", parse_all=True)[0]
+    recorder = Recorder(detail=False)
+    result = tree.evaluate(Context(recorder, rng=2))
+
+    groups = [e for e in recorder.events if e.name == "Group"]
+    assert recorder[0].startswith("1d6 -> ")
+    assert 1 <= len(groups) <= 3
+    assert sum(g.outcome["count"] for g in groups) == len(result)
+    assert sum(g.outcome["total"] for g in groups) == int(result)
+    assert recorder[-1] == (
+        f"repeat result -> {len(result)} rolls, min {min(result)}, "
+        f"max {max(result)} **{int(result)}**\n"
+    )
+
+@pytest.mark.asyncio
+async def test_normal_recorder_summary_rolled(expr: ParserElement):
+    # rolled amounts, faces and thresholds do not split the groups
+    for string, field in [
+        ("{}n(1d6 > 1d9999)", "GT y "),
+        ("{}n((1d500)d6)", "Dice#2 amount "),
+    ]:
+        sizes = []
+        for amount in (20, 2000):
+            tree = expr.parse_string(string.format(amount), parse_all=True)[0]
+            recorder = Recorder(detail=False)
+            tree.evaluate(Context(recorder, rng=1))
+            assert len(recorder) == 2
+            assert recorder[0].startswith(f"{amount}x ")
+            assert field in recorder[0]
+            sizes.append(len(recorder[0]))
+        assert sizes[1] < sizes[0] * 2
+
+@pytest.mark.asyncio
+async def test_normal_recorder_summary_nested(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+    detail, summary = Recorder(), Recorder(detail=False)
+    first = tree.evaluate(Context(detail, rng=3))
+    second = tree.evaluate(Context(summary, rng=3))
+
+    assert first == second
+    assert len(summary) < len(detail)
+    assert summary.frames == []
+    assert summary[-1].startswith(f"repeat result -> {len(first)} rolls")
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import pytest
+from pyparsing import ParserElement
+from dice.dice import Context, parse, recording
+from dice.dice.element import *
+from dice.dice.runtime import evaluate, load, load_compiled
+from dice.dice.serialize import VERSION, dumps, loads
+
+sys.setrecursionlimit(15000)
+
+TESTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.asyncio
+async def test_normal_serialize_roundtrip(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    for string in [normal_complex_dice, "3d6k2", "4n(1d(2, 5)>=3)", "-2d6"]:
+        tree = expr.parse_string(string, parse_all=True)[0]
+        data = dumps(tree)
+        assert isinstance(data, bytes)
+        copy = loads(data)
+        assert repr(copy) == repr(tree)
+        assert copy.evaluate(Context(trace=False, rng=4)) \
+            == tree.evaluate(Context(trace=False, rng=4))
+
+@pytest.mark.asyncio
+async def test_normal_serialize_format():
+    data = b'[%d,["KeepMax",["Dice",3,6],2]]' % VERSION
+    assert dumps(parse("3d6k2")) == data
+    assert dumps(parse("3d6").compile()) == dumps(parse("3d6"))
+    assert loads(dumps(IntegerList([1, 2]))) == [1, 2]
+
+@pytest.mark.asyncio
+async def test_normal_runtime():
+    data = dumps(parse("10d6k3+1"))
+    assert load(data) is load(data)
+    assert evaluate(data, Context(trace=False, rng=2)) \
+        == load_compiled(data)(Context(trace=False, rng=2))
+
+@pytest.mark.asyncio
+async def test_normal_runtime_without_pyparsing():
+    data = dumps(parse("2n(4d6k3)"))
+    code = (
+        "import sys\n"
+        "sys.modules['pyparsing'] = None\n"
+        "from dice.dice import Context, recording\n"
+        "from dice.dice.runtime import evaluate\n"
+        "with recording() as transcript:\n"
+        f"    print(evaluate({data!r}, Context(rng=1)))\n"
+        "print(len(transcript))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=TESTS,
+        capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+
+    with recording() as transcript:
+        result = parse("2n(4d6k3)").evaluate(Context(rng=1))
+    assert output == [str(result), str(len(transcript))]
+
+@pytest.mark.asyncio
+async def test_abnormal_serialize():
+    with pytest.raises(ValueError):
+        loads(b'[999,["Dice",3,6]]')
+    with pytest.raises(ValueError):
+        loads(b'[1,["Print",3]]')
+    with pytest.raises(ValueError):
+        loads(b"3d6")
+
+@pytest.mark.asyncio
+async def test_abnormal_serialize_structure():
+    for data in [
+        b'[1,3.5]', b'[1,null]', b'[1,true]', b'[1,"3"]', b'[1,[]]',
+        b'[1,{"Dice":[3,6]}]', b'[1,[3,6]]', b'[1,[["Dice"],6]]',
+        b'[1,["Dice"]]', b'[1,["Dice",3]]', b'[1,["Neg",1,2]]',
+        b'[1,["SingleDice"]]', b'[1,["Pair",1,2,3]]', b'[1,["Repeat",1]]',
+        b'[1,["Dice",3,6.0]]', b'[1,["Dice",3,["Add",1]]]',
+        b'[1,["IntegerList"]]', b'[1,["IntegerList",[1,"2"]]]',
+        b'[1,["IntegerList",[1,false]]]', b'[1,["IntegerList",1,2]]',
+        b'[1,["String",1]]', b'[1,["String","a","b"]]', b'[true,1]',
+    ]:
+        with pytest.raises(ValueError):
+            loads(data)
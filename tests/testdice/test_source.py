@@ -0,0 +1,96 @@
+import random
+import threading
+from collections import Counter
+import pytest
+from dice.dice import Context
+from dice.dice.parser import parse
+from dice.dice.recorder import Recorder
+from dice.dice.source import *
+
+EXPRESSION = "(5d6)n(2n((((2*3)d6 > 3)l3)d6))+1d(3, 9)"
+
+
+def roll(rng, string: str = EXPRESSION):
+    return repr(parse(string).evaluate(Context(Recorder(), rng=rng)))
+
+@pytest.mark.asyncio
+async def test_normal_source_seed_reproducible():
+    assert roll(7) == roll(7)
+    assert roll(random.Random(7)) == roll(random.Random(7))
+    assert roll(7) == roll(RandomSource(random.Random(7)))
+
+@pytest.mark.asyncio
+async def test_normal_source_ignores_global_state():
+    random.seed(1)
+    first = roll(5)
+    random.seed(2)
+    assert roll(5) == first
+
+@pytest.mark.asyncio
+async def test_normal_source_compiled_same_as_evaluate():
+    tree = parse(EXPRESSION)
+    compiled = tree.compile()
+    for seed in range(20):
+        assert repr(compiled(Context(Recorder(), rng=seed))) == roll(seed)
+
+@pytest.mark.asyncio
+async def test_normal_source_uniform():
+    source = as_source(3)
+    for low, high in [(1, 6), (1, 20), (-2, 2), (1, 9999)]:
+        values = source.rolls(20000, low, high)
+        assert len(values) == 20000
+        assert min(values) >= low and max(values) <= high
+
+    counts = Counter(source.rolls(60000, 1, 6))
+    assert sorted(counts) == [1, 2, 3, 4, 5, 6]
+    assert all(9000 < count < 11000 for count in counts.values())
+
+@pytest.mark.asyncio
+async def test_normal_source_edges():
+    source = as_source(3)
+    assert source.rolls(0, 1, 6) == []
+    assert source.rolls(3, 4, 4) == [4, 4, 4]
+    assert all(0 <= x < 2 ** 70 for x in source.rolls(10, 0, 2 ** 70))
+
+@pytest.mark.asyncio
+async def test_normal_source_custom():
+    class Fixed(Source):
+        def randint(self, low: int, high: int) -> int:
+            return high
+
+    assert roll(Fixed(), "3d6+1d(2, 4)") == "22"
+
+@pytest.mark.asyncio
+async def test_normal_source_numpy():
+    np = pytest.importorskip("numpy")
+    first = roll(np.random.default_rng(4))
+    assert first == roll(np.random.default_rng(4))
+    assert isinstance(as_source(np.random.default_rng()), NumpySource)
+
+@pytest.mark.asyncio
+async def test_normal_source_per_thread():
+    expected = [roll(seed) for seed in range(8)]
+    results = [None] * 8
+
+    def work(seed: int):
+        for _ in range(3):
+            results[seed] = roll(seed)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == expected
+
+@pytest.mark.asyncio
+async def test_abnormal_source_empty_range():
+    with pytest.raises(ValueError):
+        as_source(1).rolls(2, 3, 1)
+    with pytest.raises(ValueError):
+        parse("2d0").evaluate(Context(Recorder(), rng=1))
+
+@pytest.mark.asyncio
+async def test_abnormal_source_unknown():
+    with pytest.raises(TypeError):
+        Context(Recorder(), rng="seed")
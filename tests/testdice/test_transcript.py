@@ -0,0 +1,52 @@
+import pytest
+from dice.dice import BoundedRecorder, Context, parse
+from dice.dice.recorder import Recorder
+
+
+def transcript(string: str, recorder: Recorder) -> str:
+    parse(string).evaluate(Context(recorder, rng=1))
+    return "\n".join(recorder)
+
+@pytest.mark.asyncio
+async def test_normal_transcript_within_limit():
+    assert transcript("3n2d6k1", BoundedRecorder()) == \
+        transcript("3n2d6k1", Recorder())
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("string", ["1000d6", "50n10d6", "9999d6k3"])
+@pytest.mark.parametrize("limit", [100, 300, 2000])
+async def test_normal_transcript_bounded(string: str, limit: int):
+    recorder = BoundedRecorder(limit)
+    text = transcript(string, recorder)
+
+    assert len(text.encode()) <= limit
+    assert text.splitlines()[-1] == recorder.summary
+    assert recorder.summary.startswith("…and ")
+
+@pytest.mark.asyncio
+async def test_normal_transcript_hidden_dice():
+    recorder = BoundedRecorder(100)
+    text = transcript("1000d6", recorder)
+    # every shown die is followed by a comma, the last by the marker
+    shown = text.splitlines()[0].count(",")
+
+    assert recorder.hidden_dice == 1000 - shown
+    assert recorder.summary == f"…and {1000 - shown} more dice"
+
+@pytest.mark.asyncio
+async def test_normal_transcript_stream():
+    chunks = []
+    recorder = BoundedRecorder(300, chunks.append)
+    parse("50n10d6").evaluate(Context(recorder, rng=1))
+    assert chunks == recorder.events
+
+    recorder.finish()
+    recorder.finish()
+    assert chunks == list(recorder)
+
+@pytest.mark.asyncio
+async def test_normal_transcript_clear():
+    recorder = BoundedRecorder(100)
+    transcript("1000d6", recorder)
+    recorder.clear()
+    assert transcript("2d6", recorder) == transcript("2d6", Recorder())
@@ -0,0 +1,69 @@
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pyparsing import ParserElement
+from dice.dice import ChromeTrace, Context, parse
+from dice.dice.recorder import Recorder
+from dice.dice.element import *
+from dice.error.custom import *
+
+sys.setrecursionlimit(15000)
+
+
+def both(tree, **kwargs):
+    """result and transcript of the recursive and iterative evaluation"""
+    out = []
+    for iterative in (False, True):
+        recorder = Recorder(**kwargs)
+        result = tree.evaluate(Context(recorder, rng=5, iterative=iterative))
+        out.append((result, list(recorder)))
+    return out
+
+@pytest.mark.asyncio
+async def test_normal_walk_complex(
+    expr: ParserElement,
+    normal_complex_dice: str
+):
+    tree = expr.parse_string(normal_complex_dice, parse_all=True)[0]
+    recursive, iterative = both(tree)
+    assert recursive == iterative
+
+@pytest.mark.asyncio
+async def test_normal_walk_repeat_summary():
+    recursive, iterative = both(parse("5n(3d6k2)+2n1d4"), detail=False)
+    assert recursive == iterative
+
+@pytest.mark.asyncio
+async def test_normal_walk_deep():
+    depth = 50000
+    tree: Base = Integer(1)
+    for _ in range(depth):
+        tree = Neg(tree)
+
+    assert tree.evaluate(Context(trace=False, iterative=True)) == 1
+    with pytest.raises(RecursionError):
+        tree.evaluate(Context(trace=False, iterative=False))
+
+@pytest.mark.asyncio
+async def test_normal_walk_thread_default():
+    assert not Context().iterative
+    with ThreadPoolExecutor(1) as pool:
+        assert pool.submit(lambda: Context().iterative).result()
+        assert pool.submit(lambda: int(parse("3+4*2").evaluate())).result() \
+            == 11
+
+@pytest.mark.asyncio
+async def test_abnormal_walk_error():
+    events = []
+    for iterative in (False, True):
+        trace = ChromeTrace()
+        with pytest.raises(RangeException):
+            parse("2+1d(6,1)").evaluate(
+                Context(iterative=iterative, tracer=trace)
+            )
+        events.append([(e["ph"], e["name"], e["args"]) for e in trace.events])
+
+    recursive, iterative = events
+    assert recursive == iterative
+    failed = [name for _, name, args in iterative if "error" in args]
+    assert failed == ["Pair", "Dice", "Add"]